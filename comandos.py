@@ -7,8 +7,11 @@ from typing import Dict, List, Optional, Any, Callable, Tuple
 from dataclasses import dataclass
 from enum import Enum, auto
 
-# Asegúrate de que estas referencias apunten a tus clases definidas anteriormente
-# Si has unificado el archivo, estas clases ya deberían estar disponibles en el scope global.
+from constants import TokenCategoria, ModoSalida, ModoTransliteracion
+from config import ConfiguracionSistema
+from models import EstadoProceso
+from glossary import Glosario
+from consultas import GestorConsultas
 
 # ------------------------------------------------------------------------------
 # ENUMS Y ESTRUCTURAS
@@ -39,6 +39,9 @@ class ConfiguracionSistema:
     auto_decidir_timeout: bool = True  # Decidir automáticamente si no hay respuesta
     acumular_consultas: bool = True    # Acumular consultas en bloque
     
+    # Máximo de acciones que conserva el historial del glosario (anillo)
+    historial_max: int = 10000
+    
     # Debug
     debug_mode: bool = False
     
@@ -108,6 +111,7 @@ class ConfiguracionSistema:
                 for r in self.reglas_sesion
             ],
             "locuciones_predefinidas": self.locuciones_predefinidas,
+            "historial_max": self.historial_max,
             "debug_mode": self.debug_mode
         }
     
@@ -130,6 +134,7 @@ class ConfiguracionSistema:
             config.agregar_regla(r["tipo"], r["accion"], r.get("condicion"), permanente=False)
         
         config.locuciones_predefinidas = data.get("locuciones_predefinidas", [])
+        config.historial_max = data.get("historial_max", config.historial_max)
         config.debug_mode = data.get("debug_mode", False)
         
         return config
@@ -1,4 +1,4 @@
-from enum import Enum, auto
+from enum import Enum, IntEnum, auto
 from typing import List, Set
 
 class TokenStatus(Enum):
@@ -104,6 +104,20 @@ class Operador(Enum):
     LOCUCION_GUION = "-"  # A-B-C
 
 
+class CeldaTipo(IntEnum):
+    """Tipo de celda en Mtx_T (P1.B.1)"""
+    NORMAL = 0
+    INYECCION = 1
+    NULO = 2
+    ABSORBIDO = 3
+    LOCUCION = 4
+    PARTE_LOCUCION = 5
+    PENDIENTE = 6
+    SIN_TRADUCCION = 7
+    CITA = 8
+    TITULO = 9
+
+
 # Jerarquía etimológica (P4)
 JERARQUIA_ETIMOLOGICA: List[str] = [
     "LENGUA_FUENTE",
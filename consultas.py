@@ -26,6 +26,10 @@ from constants import ConsultaCodigo, DecisionOrigen, FalloCritico
 from models import Consulta, Opcion, Decision, ErrorCritico
 
 
+# Separador de los bloques de consultas y del registro de decisiones
+_SEPARADOR = "═" * 50
+
+
 # ══════════════════════════════════════════════════════════════
 # ESTRUCTURAS DE DATOS
 # ══════════════════════════════════════════════════════════════
@@ -248,17 +252,18 @@ class GestorConsultas:
         """Formatear una consulta individual"""
         return consulta.formatear()
     
-    def formatear_consultas_bloque(self) -> str:
+    def formatear_consultas_bloque(self, pendientes: Optional[List[ConsultaExtendida]] = None) -> str:
         """Formatear todas las consultas pendientes en bloque"""
-        pendientes = self.obtener_pendientes()
+        if pendientes is None:
+            pendientes = self.obtener_pendientes()
         
         if not pendientes:
             return "No hay consultas pendientes."
         
         lineas = [
-            "═" * 50,
+            _SEPARADOR,
             f"[CONSULTAS PENDIENTES: {len(pendientes)} decisiones]",
-            "═" * 50,
+            _SEPARADOR,
             ""
         ]
         
@@ -273,11 +278,11 @@ class GestorConsultas:
             lineas.append(f"    Recomendación: {c.recomendacion}")
             lineas.append("")
         
-        lineas.append("═" * 50)
+        lineas.append(_SEPARADOR)
         lineas.append("FORMATO DE RESPUESTA: 1a, 2b, 3c, ...")
         lineas.append("  'todos-rec' = aceptar todas las recomendaciones")
         lineas.append("  'pausa' = detener para revisar")
-        lineas.append("═" * 50)
+        lineas.append(_SEPARADOR)
         
         return "\n".join(lineas)
     
@@ -338,9 +343,13 @@ class GestorConsultas:
     
     def aplicar_recomendaciones_pendientes(self) -> Dict[int, str]:
         """Aplicar recomendaciones a todas las consultas pendientes"""
+        return self.aplicar_recomendaciones(self.obtener_pendientes())
+    
+    def aplicar_recomendaciones(self, pendientes: List[ConsultaExtendida]) -> Dict[int, str]:
+        """Aplicar recomendaciones a una lista de pendientes ya obtenida"""
         resultado = {}
         
-        for ce in self.obtener_pendientes():
+        for ce in pendientes:
             opcion = ce.consulta.recomendacion
             ce.marcar_inferida(opcion)
             resultado[ce.consulta.numero] = opcion
@@ -428,9 +437,9 @@ class GestorConsultas:
             return "No hay decisiones registradas."
         
         lineas = [
-            "═" * 50,
+            _SEPARADOR,
             "HISTORIAL DE DECISIONES",
-            "═" * 50,
+            _SEPARADOR,
             ""
         ]
         
@@ -442,7 +451,7 @@ class GestorConsultas:
             lineas.append(f"    Origen: {d.origen.name}")
             lineas.append("")
         
-        lineas.append("═" * 50)
+        lineas.append(_SEPARADOR)
         return "\n".join(lineas)
     
     # ══════════════════════════════════════════════════════════
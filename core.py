@@ -15,7 +15,7 @@ ESTRUCTURAS:
 from typing import List, Optional, Tuple, Any
 from dataclasses import dataclass
 
-from constants import TokenStatus, TokenCategoria, FalloCritico
+from constants import TokenStatus, TokenCategoria, FalloCritico, CeldaTipo
 from models import (
     SlotN, SlotP, MatrizFuente, MatrizTarget, 
     Locucion, ErrorCritico, CeldaMatriz
@@ -103,6 +103,13 @@ class Core:
         """Inyectar reparador sintáctico (P7)"""
         self._reparador = reparador
     
+    def reset(self) -> None:
+        """Limpiar estado interno conservando los procesadores inyectados"""
+        self.mtx_s = None
+        self.mtx_t = None
+        self._errores = []
+        self._fase_actual = "INICIO"
+    
     # ══════════════════════════════════════════════════════════
     # MÉTODO PRINCIPAL
     # ══════════════════════════════════════════════════════════
@@ -200,15 +207,11 @@ class Core:
         # 1.3. Crear matriz target con mismo tamaño
         self.mtx_t = MatrizTarget(self.mtx_s.size())
         
-        # 1.4. Verificar todos los tokens en glosario
-        for celda in self.mtx_s.celdas:
-            try:
-                self.glosario.fase_b_verificar_existencia(
-                    celda.token_src, 
-                    celda.pos
-                )
-            except TokenNoRegistradoError:
-                raise
+        # 1.4. Verificar todos los tokens en glosario (en lote)
+        self.glosario.fase_b_verificar_existencia_lote(
+            [celda.token_src for celda in self.mtx_s.celdas],
+            self.mtx_s.posiciones()
+        )
         
         return True
     
@@ -227,25 +230,29 @@ class Core:
         if not self._procesador_nucleos:
             raise CoreError("Procesador de núcleos no configurado (P4)")
         
+        tipos = self.mtx_t.tipos
+        pendientes = []
         for slot_n in self.mtx_s.slots_n:
             if slot_n.es_bloqueado():
                 # Token pertenece a locución
-                self.mtx_t.celdas[slot_n.pos_index].tipo = "parte_locucion"
-                continue
-            
-            # Ejecutar P4
-            resultado = self._procesador_nucleos.procesar(slot_n, self.glosario)
-            
-            if resultado.get("restart"):
+                tipos[slot_n.pos_index] = CeldaTipo.PARTE_LOCUCION
+            else:
+                pendientes.append(slot_n)
+        
+        # Ejecutar P4 sobre todos los núcleos de la oración
+        resultados = self._procesador_nucleos.procesar_lote(pendientes, self.glosario)
+        
+        for slot_n, resultado in zip(pendientes, resultados):
+            if resultado.restart:
                 # P4 gestionó vía P6, usar valor registrado
                 slot_n.token_tgt = self.glosario.obtener_traduccion(slot_n.token_src)
-            elif resultado.get("bloqueado"):
+            elif resultado.bloqueado:
                 # Era parte de locución
-                self.mtx_t.celdas[slot_n.pos_index].tipo = "parte_locucion"
+                tipos[slot_n.pos_index] = CeldaTipo.PARTE_LOCUCION
             else:
                 # Asignación normal
-                slot_n.token_tgt = resultado.get("token_tgt")
-                slot_n.morph_tgt = resultado.get("morph_tgt")
+                slot_n.token_tgt = resultado.token_tgt
+                slot_n.morph_tgt = resultado.morph_tgt
         
         return True
     
@@ -263,9 +270,12 @@ class Core:
           - Si BLOQUEADO → insertar locución completa o marcar absorbido
           - Si partícula → [PENDIENTE]
         """
+        tokens_src = self.mtx_t.tokens_src
+        tokens_tgt = self.mtx_t.tokens_tgt
+        tipos = self.mtx_t.tipos
+        
         for i, celda_s in enumerate(self.mtx_s.celdas):
-            celda_t = self.mtx_t.celdas[i]
-            celda_t.token_src = celda_s.token_src
+            tokens_src[i] = celda_s.token_src
             
             slot = celda_s.slot
             
@@ -278,8 +288,8 @@ class Core:
                 if loc:
                     if i == loc.primera_posicion():
                         # Primera posición: insertar traducción completa
-                        celda_t.token_tgt = loc.tgt
-                        celda_t.tipo = "locucion"
+                        tokens_tgt[i] = loc.tgt
+                        tipos[i] = CeldaTipo.LOCUCION
                     else:
                         # Posiciones siguientes: marcar absorbido
                         self.mtx_t.marcar_absorbido(i)
@@ -287,11 +297,11 @@ class Core:
             
             # Token normal
             if isinstance(slot, SlotN):
-                celda_t.token_tgt = slot.token_tgt
-                celda_t.tipo = "normal"
+                tokens_tgt[i] = slot.token_tgt
+                tipos[i] = CeldaTipo.NORMAL
             else:
                 # Partícula - pendiente
-                celda_t.tipo = "pendiente"
+                tipos[i] = CeldaTipo.PENDIENTE
     
     # ══════════════════════════════════════════════════════════
     # F4-F7. PROCESAMIENTO DE PARTÍCULAS CON COHESIÓN
@@ -320,15 +330,15 @@ class Core:
             
             if not candidatos:
                 # Sin candidatos - marcar como problema
-                self.mtx_t.celdas[slot_p.pos_index].token_tgt = slot_p.token_src
-                self.mtx_t.celdas[slot_p.pos_index].tipo = "sin_traduccion"
+                self.mtx_t.tokens_tgt[slot_p.pos_index] = slot_p.token_src
+                self.mtx_t.tipos[slot_p.pos_index] = CeldaTipo.SIN_TRADUCCION
                 continue
             
             # Ciclo de cohesión
             exito = False
             for try_idx, candidato in enumerate(candidatos):
                 # Asignar candidato
-                self.mtx_t.celdas[slot_p.pos_index].token_tgt = candidato
+                self.mtx_t.tokens_tgt[slot_p.pos_index] = candidato
                 
                 # F5. Ajuste (P7)
                 if self._reparador:
@@ -347,7 +357,7 @@ class Core:
             
             if not exito:
                 # FAIL CRÍTICO - usar primer candidato y marcar nulo
-                self.mtx_t.celdas[slot_p.pos_index].token_tgt = candidatos[0]
+                self.mtx_t.tokens_tgt[slot_p.pos_index] = candidatos[0]
                 self.mtx_t.marcar_nulo(slot_p.pos_index)
             
             # F7. Auditoría de isomorfismo
@@ -417,17 +427,17 @@ class Core:
             return ""
         
         tokens = []
-        for celda in self.mtx_t.celdas:
-            if celda.es_absorbido():
+        for tipo, token_tgt in zip(self.mtx_t.tipos, self.mtx_t.tokens_tgt):
+            if tipo is CeldaTipo.ABSORBIDO:
                 continue  # No renderizar
             
-            if celda.token_tgt:
-                if celda.es_inyeccion():
-                    tokens.append(f"[{celda.token_tgt}]")
-                elif celda.es_nulo():
-                    tokens.append(f"{{{celda.token_tgt}}}")
+            if token_tgt:
+                if tipo is CeldaTipo.INYECCION:
+                    tokens.append(f"[{token_tgt}]")
+                elif tipo is CeldaTipo.NULO:
+                    tokens.append(f"{{{token_tgt}}}")
                 else:
-                    tokens.append(celda.token_tgt)
+                    tokens.append(token_tgt)
         
         # Agregar inyecciones
         for iny in self.mtx_t.inyecciones:
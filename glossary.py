@@ -16,11 +16,25 @@ PRINCIPIOS:
   - Registro completo: OBLIGATORIO (FALLO CRÍTICO si incompleto)
 """
 
+import io
 import re
+import csv
+import sys
 import json
-from typing import Dict, List, Optional, Tuple, Set, Any
+import time
+from array import array
+from collections import Counter
+from itertools import chain
+from typing import Dict, List, Optional, Tuple, Set, Any, TextIO, Sequence, Mapping, Iterator
 from dataclasses import dataclass, field
 from datetime import datetime
+from types import MappingProxyType
+
+# orjson es opcional: si está instalado acelera la exportación/importación JSON
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from constants import (
     TokenStatus, TokenCategoria, CategoriaGramatical,
@@ -34,6 +48,85 @@ from models import (
 from config import obtener_config
 
 
+# Palabras del texto para la verificación de completitud (P8.A4);
+# equivale a \b\w+\b: findall ya devuelve tramos \w máximos
+_WORD_RE = re.compile(r'\w+')
+# Variante en bytes para textos ASCII: sin transliteraciones (ʿ, ā...)
+# \w en bytes coincide con \w en str, y el barrido es más barato
+_WORD_RE_B = re.compile(rb'\w+')
+
+
+def _palabras_texto(texto: str) -> Set[str]:
+    """Conjunto de palabras del texto (P8.A4)"""
+    if texto.isascii():
+        return {p.decode('ascii') for p in set(_WORD_RE_B.findall(texto.encode('ascii')))}
+    return set(_WORD_RE.findall(texto))
+
+# Heurística de locuciones (P8.A1): partícula + palabra + sufijo pronominal árabe
+_PATRONES_HEURISTICOS: Tuple["re.Pattern", ...] = (
+    re.compile(
+        r'\b(bi|li|fi|min|ʿan|ʿalā)-?(\w+)-?(hā|hu|humā|hum|hunna|ka|ki|kumā|kum|kunna|ī|nā)\b',
+        re.IGNORECASE
+    ),
+)
+
+
+# Códigos de verificación de Fase B (los comprobadores internos no lanzan)
+_VERIF_OK = 0
+_VERIF_NO_REGISTRADO = 1
+_VERIF_SINONIMIA = 2
+
+
+# Decodificación de enums en la importación (sin pasar por EnumMeta.__getitem__)
+_CATEGORIA_POR_NOMBRE: Dict[str, TokenCategoria] = {c.name: c for c in TokenCategoria}
+_STATUS_POR_NOMBRE: Dict[str, TokenStatus] = {s.name: s for s in TokenStatus}
+
+# Miembro en caché para la comparación por identidad de fase_b_verificar_bloqueo
+_BLOQUEADO = TokenStatus.BLOQUEADO
+
+# Y a la inversa para la exportación (sin el descriptor .name por entrada)
+_NOMBRE_CATEGORIA: Dict[TokenCategoria, str] = {c: c.name for c in TokenCategoria}
+_NOMBRE_STATUS: Dict[TokenStatus, str] = {s: s.name for s in TokenStatus}
+
+
+# Margen a partir del cual una entrada figura en [ALTERNATIVAS]
+_MARGEN_ALTERNATIVA = 3
+
+# Separador de los listados formateados
+_SEPARADOR = "═" * 50
+_SEPARADOR_ALTERNATIVA = "-" * 40
+
+# Regla bajo el título de la exportación en texto plano
+_REGLA_EXPORTACION = "=" * 40
+
+
+# Acciones del historial, guardadas como código entero
+_ACCIONES_HISTORIAL: List[str] = [
+    "GLOSARIO_SELLADO",
+    "ASIGNACION",
+    "ACTUALIZACION_USUARIO",
+    "ENTRADA_AGREGADA_USUARIO",
+    "LOCUCION_AGREGADA_USUARIO",
+    "ENTRADA_ELIMINADA_USUARIO",
+]
+_CODIGO_ACCION: Dict[str, int] = {a: i for i, a in enumerate(_ACCIONES_HISTORIAL)}
+
+
+def _codigo_accion(accion: str) -> int:
+    """Código entero de una acción (las nuevas se registran al vuelo)"""
+    codigo = _CODIGO_ACCION.get(accion)
+    if codigo is None:
+        codigo = _CODIGO_ACCION[accion] = len(_ACCIONES_HISTORIAL)
+        _ACCIONES_HISTORIAL.append(accion)
+    return codigo
+
+
+def _formatear_ts(ns: int) -> str:
+    """Marca de tiempo del historial (ns desde epoch) en ISO-8601"""
+    segundos, resto = divmod(ns, 1_000_000_000)
+    return datetime.fromtimestamp(segundos).replace(microsecond=resto // 1000).isoformat()
+
+
 # ══════════════════════════════════════════════════════════════
 # EXCEPCIONES ESPECÍFICAS
 # ══════════════════════════════════════════════════════════════
@@ -64,9 +157,12 @@ class SinonimiaError(GlosarioError):
 
 class TokenNoRegistradoError(GlosarioError):
     """FALLO CRÍTICO: Token no registrado (P8.B1)"""
-    def __init__(self, token: str, posicion: int):
+    def __init__(self, token: str, posicion: int,
+                 fallos: Optional[List[Tuple[int, str, int]]] = None):
         self.token = token
         self.posicion = posicion
+        # (código, token, posición) de todos los fallos del lote
+        self.fallos = fallos if fallos is not None else [(_VERIF_NO_REGISTRADO, token, posicion)]
         super().__init__(f"Token no registrado: '{token}' en posición {posicion}")
 
 
@@ -91,18 +187,69 @@ class Glosario:
         # Locuciones detectadas
         self._locuciones: Dict[str, Locucion] = {}
         
+        # Métodos get ligados de los dos diccionarios (consultas por token)
+        self._entrada_get = self._entradas.get
+        self._locucion_get = self._locuciones.get
+        
+        # Índice (componente, posición) → ID de locución
+        self._token_pos_a_locucion: Dict[Tuple[str, int], str] = {}
+        
+        # Índice componente → IDs de locución (en orden de registro)
+        self._componente_a_locuciones: Dict[str, List[str]] = {}
+        
+        # Entradas + componentes de locuciones, mantenido incrementalmente
+        self._tokens_registrados: Set[str] = set()
+        
+        # Número de entradas por estado, mantenido en cada transición
+        self._conteo_status: Dict[TokenStatus, int] = dict.fromkeys(TokenStatus, 0)
+        
+        # Tokens de alto margen ([ALTERNATIVAS]), mantenidos al cambiar márgenes;
+        # se listan en el orden del glosario, no en el de su cambio de margen
+        self._alternativas: Set[str] = set()
+        
+        # Vista ordenada por margen; se invalida al cambiar entradas o márgenes
+        self._por_margen: Optional[List[EntradaGlosario]] = None
+        
         # Contador de locuciones
         self._locucion_counter: int = 0
         
         # Estado
         self._sellado: bool = False
         
-        # Historial de cambios
-        self._historial: List[Dict[str, Any]] = []
+        # Historial de cambios: columnas en anillo (marca de tiempo en ns,
+        # código de acción, datos); al llenarse se pisa lo más antiguo
+        self._historial_max: int = max(1, obtener_config().historial_max)
+        self._h_ts = array('q')
+        self._h_accion = array('h')
+        self._h_datos: List[Dict[str, Any]] = []
+        self._h_inicio: int = 0
         
         # Consultas pendientes
         self._consultas_pendientes: List[Consulta] = []
     
+    def reset(self) -> None:
+        """
+        Vaciar el glosario en el sitio
+        
+        Conserva el objeto (y las referencias que otros componentes tienen
+        de él) en lugar de crear uno nuevo.
+        """
+        self._entradas.clear()
+        self._locuciones.clear()
+        self._token_pos_a_locucion.clear()
+        self._componente_a_locuciones.clear()
+        self._tokens_registrados.clear()
+        self._conteo_status = dict.fromkeys(TokenStatus, 0)
+        self._alternativas.clear()
+        self._por_margen = None
+        self._locucion_counter = 0
+        self._sellado = False
+        del self._h_ts[:]
+        del self._h_accion[:]
+        self._h_datos.clear()
+        self._h_inicio = 0
+        self._consultas_pendientes.clear()
+    
     # ══════════════════════════════════════════════════════════
     # FASE A: PRE-TRADUCCIÓN
     # ══════════════════════════════════════════════════════════
@@ -142,34 +289,33 @@ class Glosario:
         locuciones_detectadas = []
         config = obtener_config()
         
-        # Método 1: Lista predefinida
+        # Método 1: Lista predefinida. Cada patrón se busca por separado:
+        # una locución contenida en otra (o solapada con ella) también cuenta
         for loc_predefinida in config.locuciones_predefinidas:
-            if loc_predefinida in texto:
-                loc = self._crear_locucion_desde_patron(loc_predefinida, texto)
+            inicio = texto.find(loc_predefinida)
+            if inicio != -1:
+                # La búsqueda ya da la primera aparición: no se vuelve a buscar
+                loc = self._crear_locucion_desde_patron(loc_predefinida, texto, inicio)
                 if loc:
                     locuciones_detectadas.append(loc)
         
         # Método 2: Heurística básica (bajo consumo)
-        # Patrón: partícula + palabra + sufijo pronominal árabe
-        # Ejemplo simplificado para demostración
-        patrones_heuristicos = [
-            r'\b(bi|li|fi|min|ʿan|ʿalā)-?(\w+)-?(hā|hu|humā|hum|hunna|ka|ki|kumā|kum|kunna|ī|nā)\b',
-        ]
-        
-        for patron in patrones_heuristicos:
-            matches = re.finditer(patron, texto, re.IGNORECASE)
-            for match in matches:
+        srcs_detectadas = {l.src for l in locuciones_detectadas}
+        for patron in _PATRONES_HEURISTICOS:
+            for match in patron.finditer(texto):
                 # Crear consulta C3 para confirmar
                 posible_loc = match.group(0)
-                if posible_loc not in [l.src for l in locuciones_detectadas]:
+                if posible_loc not in srcs_detectadas:
                     consulta = self._crear_consulta_locucion(posible_loc, match.start())
                     self._consultas_pendientes.append(consulta)
         
         return locuciones_detectadas
     
-    def _crear_locucion_desde_patron(self, patron: str, texto: str) -> Optional[Locucion]:
-        """Crear locución desde patrón conocido"""
-        pos = texto.find(patron)
+    def _crear_locucion_desde_patron(self, patron: str, texto: str,
+                                     pos: Optional[int] = None) -> Optional[Locucion]:
+        """Crear locución desde patrón conocido (`pos`: inicio ya localizado)"""
+        if pos is None:
+            pos = texto.find(patron)
         if pos == -1:
             return None
         
@@ -177,7 +323,7 @@ class Glosario:
         loc_id = f"LOC_{self._locucion_counter:04d}"
         
         # Separar componentes (simplificado)
-        componentes = patron.replace("-", " ").split()
+        componentes = [sys.intern(c) for c in patron.replace("-", " ").split()]
         
         # Calcular posiciones (aproximado - se ajusta en tokenización real)
         posiciones = list(range(pos, pos + len(componentes)))
@@ -189,7 +335,7 @@ class Glosario:
             posiciones=posiciones
         )
         
-        self._locuciones[loc_id] = locucion
+        self._registrar_locucion(locucion)
         return locucion
     
     def _crear_consulta_locucion(self, posible_loc: str, posicion: int) -> Consulta:
@@ -222,7 +368,7 @@ class Glosario:
         self._locucion_counter += 1
         loc_id = f"LOC_{self._locucion_counter:04d}"
         
-        componentes = src.replace("-", " ").split()
+        componentes = [sys.intern(c) for c in src.replace("-", " ").split()]
         
         locucion = Locucion(
             id=loc_id,
@@ -234,9 +380,21 @@ class Glosario:
         if traduccion_etym:
             locucion.generar_traduccion(traduccion_etym)
         
-        self._locuciones[loc_id] = locucion
+        self._registrar_locucion(locucion)
         return locucion
     
+    def _registrar_locucion(self, locucion: Locucion) -> None:
+        """Guardar locución e indexar sus pares (componente, posición)"""
+        self._locuciones[locucion.id] = locucion
+        self._tokens_registrados.update(locucion.componentes)
+        for comp in locucion.componentes:
+            ids = self._componente_a_locuciones.setdefault(comp, [])
+            if locucion.id not in ids:
+                ids.append(locucion.id)
+            for pos in locucion.posiciones:
+                # La primera locución registrada conserva la posición
+                self._token_pos_a_locucion.setdefault((comp, pos), locucion.id)
+    
     def _a3_registrar_tokens(self, tokens_clasificados: List[Tuple[str, TokenCategoria, CategoriaGramatical]]) -> None:
         """
         A3. Registro inicial (P8.A3)
@@ -244,6 +402,8 @@ class Glosario:
         Registrar todos los tokens con status PENDIENTE
         """
         for idx, (token, categoria, cat_gram) in enumerate(tokens_clasificados):
+            # Claves internadas: las búsquedas posteriores comparan por identidad
+            token = sys.intern(token)
             # Verificar si token está bloqueado por locución
             locucion_id = self._token_en_locucion(token, idx)
             
@@ -252,19 +412,57 @@ class Glosario:
                     token_src=token,
                     categoria=categoria,
                     status=TokenStatus.BLOQUEADO if locucion_id else TokenStatus.PENDIENTE,
-                    ocurrencias=[idx]
+                    ocurrencias=array('i', (idx,))
                 )
-                self._entradas[token] = entrada
+                self._insertar_entrada(entrada)
             else:
                 # Token ya existe, agregar ocurrencia
                 self._entradas[token].ocurrencias.append(idx)
     
+    def _insertar_entrada(self, entrada: EntradaGlosario) -> None:
+        """Único punto de alta de entradas: mantiene índices y contadores"""
+        token = entrada.token_src
+        self._entradas[token] = entrada
+        self._tokens_registrados.add(token)
+        self._conteo_status[entrada.status] += 1
+        if entrada.margen >= _MARGEN_ALTERNATIVA:
+            self._alternativas.add(token)
+        self._por_margen = None
+    
+    def _cargar_entradas(self, entradas: Dict[str, EntradaGlosario]) -> None:
+        """Alta en bloque sobre un glosario vacío: índices y contadores de una vez"""
+        self._entradas = entradas
+        self._entrada_get = entradas.get
+        self._tokens_registrados.update(entradas)
+        conteo = self._conteo_status
+        for status, n in Counter(e.status for e in entradas.values()).items():
+            conteo[status] += n
+        self._alternativas = {
+            token for token, e in entradas.items() if e.margen >= _MARGEN_ALTERNATIVA
+        }
+        self._por_margen = None
+    
+    def _fijar_status(self, entrada: EntradaGlosario, status: TokenStatus) -> None:
+        """Cambiar el estado de una entrada manteniendo los contadores"""
+        conteo = self._conteo_status
+        conteo[entrada.status] -= 1
+        conteo[status] += 1
+        entrada.status = status
+    
+    def _fijar_margen(self, entrada: EntradaGlosario, margen: int) -> None:
+        """Cambiar el margen de una entrada manteniendo las vistas derivadas"""
+        if entrada.margen == margen:
+            return
+        entrada.margen = margen
+        if margen >= _MARGEN_ALTERNATIVA:
+            self._alternativas.add(entrada.token_src)
+        else:
+            self._alternativas.discard(entrada.token_src)
+        self._por_margen = None
+    
     def _token_en_locucion(self, token: str, posicion: int) -> Optional[str]:
         """Verificar si token pertenece a locución en esta posición"""
-        for loc_id, loc in self._locuciones.items():
-            if token in loc.componentes and posicion in loc.posiciones:
-                return loc_id
-        return None
+        return self._token_pos_a_locucion.get((token, posicion))
     
     def _a4_verificar_completitud(self, texto: str) -> bool:
         """
@@ -273,18 +471,13 @@ class Glosario:
         OBLIGATORIA - FALLO CRÍTICO si incompleto
         """
         # Contar tokens en texto (simplificado)
-        tokens_texto = set(re.findall(r'\b\w+\b', texto))
-        tokens_registrados = set(self._entradas.keys())
-        
-        # Agregar componentes de locuciones
-        for loc in self._locuciones.values():
-            tokens_registrados.update(loc.componentes)
-        
-        faltantes = list(tokens_texto - tokens_registrados)
-        sobrantes = list(tokens_registrados - tokens_texto)
+        palabras = _palabras_texto(texto)
+        faltantes = palabras - self._tokens_registrados
         
         if faltantes:
-            raise RegistroIncompletoError(faltantes, sobrantes)
+            # Los sobrantes solo se reportan en el error
+            sobrantes = self._tokens_registrados - palabras
+            raise RegistroIncompletoError(list(faltantes), list(sobrantes))
         
         # Sellar glosario
         self._sellado = True
@@ -303,6 +496,10 @@ class Glosario:
     # FASE B: DURANTE TRADUCCIÓN
     # ══════════════════════════════════════════════════════════
     
+    def _comprobar_existencia(self, token: str) -> int:
+        """Núcleo de B1: código de verificación sin lanzar"""
+        return _VERIF_OK if token in self._entradas else _VERIF_NO_REGISTRADO
+    
     def fase_b_verificar_existencia(self, token: str, posicion: int) -> bool:
         """
         B1. Verificación de existencia (P8.B1)
@@ -310,10 +507,33 @@ class Glosario:
         Raises:
             TokenNoRegistradoError: Si token no existe
         """
-        if token not in self._entradas:
+        if self._comprobar_existencia(token) != _VERIF_OK:
             raise TokenNoRegistradoError(token, posicion)
         return True
     
+    def fase_b_verificar_existencia_lote(self, tokens: Sequence[str],
+                                         posiciones: Sequence[int]) -> bool:
+        """
+        B1 en lote: verificar todos los tokens de una oración de una vez
+        
+        La inclusión se comprueba con una sola operación de conjuntos;
+        solo si falla se recorre la oración acumulando los fallos, y se
+        lanza una única excepción al final del lote.
+        
+        Raises:
+            TokenNoRegistradoError: Con el primer token ausente y la
+                lista completa de fallos en ``fallos``
+        """
+        entradas = self._entradas
+        if entradas.keys() >= set(tokens):
+            return True
+        
+        fallos = [(_VERIF_NO_REGISTRADO, token, posicion)
+                  for token, posicion in zip(tokens, posiciones)
+                  if token not in entradas]
+        _, token, posicion = fallos[0]
+        raise TokenNoRegistradoError(token, posicion, fallos)
+    
     def fase_b_verificar_bloqueo(self, token: str, posicion: int) -> Optional[str]:
         """
         B2. Verificación de bloqueo (P8.B2)
@@ -325,12 +545,12 @@ class Glosario:
         if locucion_id:
             return locucion_id
         
-        entrada = self._entradas.get(token)
-        if entrada and entrada.status == TokenStatus.BLOQUEADO:
-            # Buscar a qué locución pertenece
-            for loc_id, loc in self._locuciones.items():
-                if token in loc.componentes:
-                    return loc_id
+        entrada = self._entrada_get(token)
+        if entrada and entrada.status is _BLOQUEADO:
+            # Buscar a qué locución pertenece (la primera registrada)
+            ids = self._componente_a_locuciones.get(token)
+            if ids:
+                return ids[0]
         
         return None
     
@@ -341,20 +561,26 @@ class Glosario:
         Raises:
             SinonimiaError: Si intenta asignar traducción diferente a núcleo
         """
-        entrada = self._entradas.get(token)
+        entrada = self._entrada_get(token)
         if not entrada:
             return True  # Se manejará en B1
         
         # Solo verificar sinonimia en NÚCLEOS
-        if entrada.categoria != TokenCategoria.NUCLEO:
+        if entrada.categoria is not TokenCategoria.NUCLEO:
             return True  # Partículas son polivalentes
         
-        if entrada.token_tgt is not None and entrada.token_tgt != "":
-            if tgt_propuesto != entrada.token_tgt:
-                raise SinonimiaError(token, entrada.token_tgt, tgt_propuesto)
-        
+        if self._comprobar_sinonimia(entrada, tgt_propuesto) != _VERIF_OK:
+            raise SinonimiaError(entrada.token_src, entrada.token_tgt, tgt_propuesto)
         return True
     
+    @staticmethod
+    def _comprobar_sinonimia(entrada: EntradaGlosario, tgt_propuesto: str) -> int:
+        """Núcleo de B3 sobre una entrada ya obtenida: código sin lanzar"""
+        existente = entrada.token_tgt
+        if existente and tgt_propuesto != existente:
+            return _VERIF_SINONIMIA
+        return _VERIF_OK
+    
     def fase_b_asignar(self, token: str, tgt: str, margen: int = 1,
                        etiqueta: Optional[str] = None,
                        func_role: Optional[FuncRole] = None) -> bool:
@@ -368,23 +594,26 @@ class Glosario:
             etiqueta: NO_ROOT, COLLISION, etc.
             func_role: Función sintáctica (solo partículas)
         """
-        entrada = self._entradas.get(token)
+        entrada = self._entrada_get(token)
         if not entrada:
             return False
         
+        categoria = entrada.categoria
+        
         # Si es núcleo y ya tiene traducción, verificar sinonimia
-        if entrada.es_nucleo() and entrada.token_tgt:
-            self.fase_b_verificar_sinonimia(token, tgt)
+        if categoria is TokenCategoria.NUCLEO and entrada.token_tgt:
+            if self._comprobar_sinonimia(entrada, tgt) != _VERIF_OK:
+                raise SinonimiaError(token, entrada.token_tgt, tgt)
             return True  # Ya asignado correctamente
         
         # Asignar
-        if entrada.es_particula() and func_role:
+        if func_role and categoria is TokenCategoria.PARTICULA:
             # Partículas pueden tener traducciones por función
             entrada.traducciones_por_funcion[func_role] = tgt
         
         entrada.token_tgt = tgt
-        entrada.status = TokenStatus.ASIGNADO
-        entrada.margen = margen
+        self._fijar_status(entrada, TokenStatus.ASIGNADO)
+        self._fijar_margen(entrada, margen)
         entrada.etiqueta = etiqueta
         
         self._registrar_historial("ASIGNACION", {
@@ -404,7 +633,7 @@ class Glosario:
             token: Token fuente
             func_role: Función sintáctica (para partículas polivalentes)
         """
-        entrada = self._entradas.get(token)
+        entrada = self._entrada_get(token)
         if not entrada:
             return None
         
@@ -416,7 +645,7 @@ class Glosario:
     
     def obtener_traduccion_locucion(self, locucion_id: str) -> Optional[str]:
         """Obtener traducción de una locución"""
-        loc = self._locuciones.get(locucion_id)
+        loc = self._locucion_get(locucion_id)
         return loc.tgt if loc else None
     
     # ══════════════════════════════════════════════════════════
@@ -430,7 +659,7 @@ class Glosario:
         Returns:
             (éxito, ocurrencias_afectadas)
         """
-        entrada = self._entradas.get(token)
+        entrada = self._entrada_get(token)
         if not entrada:
             return False, 0
         
@@ -457,7 +686,7 @@ class Glosario:
             token_tgt=tgt,
             status=TokenStatus.ASIGNADO if tgt else TokenStatus.PENDIENTE
         )
-        self._entradas[token] = entrada
+        self._insertar_entrada(entrada)
         
         self._registrar_historial("ENTRADA_AGREGADA_USUARIO", {
             "token": token,
@@ -468,7 +697,7 @@ class Glosario:
         return True
     
     def agregar_locucion(self, src: str, componentes: List[str],
-                         posiciones: List[int], tgt: str) -> Locucion:
+                         posiciones: Sequence[int], tgt: str) -> Locucion:
         """
         Agregar locución manual (solo usuario)
         """
@@ -483,12 +712,12 @@ class Glosario:
             tgt=tgt
         )
         
-        self._locuciones[loc_id] = locucion
+        self._registrar_locucion(locucion)
         
         # Bloquear componentes
-        for comp in componentes:
-            if comp in self._entradas:
-                self._entradas[comp].status = TokenStatus.BLOQUEADO
+        entradas = self._entradas
+        for comp in entradas.keys() & componentes:
+            self._fijar_status(entradas[comp], TokenStatus.BLOQUEADO)
         
         self._registrar_historial("LOCUCION_AGREGADA_USUARIO", {
             "id": loc_id,
@@ -505,12 +734,17 @@ class Glosario:
         Returns:
             (éxito, ocurrencias_afectadas)
         """
-        entrada = self._entradas.get(token)
+        entrada = self._entrada_get(token)
         if not entrada:
             return False, 0
         
         ocurrencias = len(entrada.ocurrencias)
         del self._entradas[token]
+        self._conteo_status[entrada.status] -= 1
+        self._alternativas.discard(token)
+        self._por_margen = None
+        if token not in self._componente_a_locuciones:
+            self._tokens_registrados.discard(token)
         
         self._registrar_historial("ENTRADA_ELIMINADA_USUARIO", {
             "token": token,
@@ -525,43 +759,49 @@ class Glosario:
     
     def obtener_entrada(self, token: str) -> Optional[EntradaGlosario]:
         """Obtener entrada por token"""
-        return self._entradas.get(token)
+        return self._entrada_get(token)
     
     def obtener_locucion(self, loc_id: str) -> Optional[Locucion]:
         """Obtener locución por ID"""
-        return self._locuciones.get(loc_id)
+        return self._locucion_get(loc_id)
     
-    def obtener_locuciones(self) -> Dict[str, Locucion]:
-        """Obtener todas las locuciones"""
-        return self._locuciones.copy()
+    def obtener_locuciones(self) -> Mapping[str, Locucion]:
+        """Obtener todas las locuciones (vista de solo lectura, sin copia)"""
+        return self.vista_locuciones()
+    
+    def vista_locuciones(self) -> MappingProxyType:
+        """Vista de solo lectura de las locuciones (sin copia)"""
+        return MappingProxyType(self._locuciones)
     
     def obtener_entradas_por_margen(self) -> List[EntradaGlosario]:
         """Obtener entradas ordenadas por margen (mayor a menor)"""
-        return sorted(
-            self._entradas.values(),
-            key=lambda e: e.margen,
-            reverse=True
-        )
+        return list(self._entradas_por_margen())
+    
+    def _entradas_por_margen(self) -> List[EntradaGlosario]:
+        """Vista ordenada compartida (no modificar); se ordena solo tras cambios"""
+        if self._por_margen is None:
+            self._por_margen = sorted(
+                self._entradas.values(),
+                key=lambda e: e.margen,
+                reverse=True
+            )
+        return self._por_margen
     
     def obtener_alternativas(self) -> List[EntradaGlosario]:
         """Obtener entradas de alto margen (para comando [ALTERNATIVAS])"""
-        return [e for e in self._entradas.values() if e.margen >= 3]
+        alternativas = self._alternativas
+        if not alternativas:
+            return []
+        return [e for token, e in self._entradas.items() if token in alternativas]
     
     def obtener_estadisticas(self) -> Dict[str, int]:
         """Obtener estadísticas del glosario"""
-        total = len(self._entradas)
-        asignadas = sum(1 for e in self._entradas.values() 
-                        if e.status == TokenStatus.ASIGNADO)
-        pendientes = sum(1 for e in self._entradas.values() 
-                         if e.status == TokenStatus.PENDIENTE)
-        bloqueadas = sum(1 for e in self._entradas.values() 
-                         if e.status == TokenStatus.BLOQUEADO)
-        
+        conteo = self._conteo_status
         return {
-            "total": total,
-            "asignadas": asignadas,
-            "pendientes": pendientes,
-            "bloqueadas": bloqueadas,
+            "total": len(self._entradas),
+            "asignadas": conteo[TokenStatus.ASIGNADO],
+            "pendientes": conteo[TokenStatus.PENDIENTE],
+            "bloqueadas": conteo[TokenStatus.BLOQUEADO],
             "locuciones": len(self._locuciones)
         }
     
@@ -579,15 +819,33 @@ class Glosario:
     
     def _registrar_historial(self, accion: str, datos: Dict[str, Any]) -> None:
         """Registrar acción en historial"""
-        self._historial.append({
-            "accion": accion,
-            "datos": datos,
-            "timestamp": datetime.now().isoformat()
-        })
+        ts = time.time_ns()
+        codigo = _codigo_accion(accion)
+        
+        if len(self._h_datos) < self._historial_max:
+            self._h_ts.append(ts)
+            self._h_accion.append(codigo)
+            self._h_datos.append(datos)
+        else:
+            i = self._h_inicio
+            self._h_ts[i] = ts
+            self._h_accion[i] = codigo
+            self._h_datos[i] = datos
+            self._h_inicio = (i + 1) % self._historial_max
     
     def obtener_historial(self) -> List[Dict[str, Any]]:
-        """Obtener historial de cambios"""
-        return self._historial.copy()
+        """Obtener historial de cambios (del más antiguo al más reciente)"""
+        return list(self.iterar_historial())
+    
+    def iterar_historial(self) -> Iterator[Dict[str, Any]]:
+        """Recorrer el historial sin materializarlo (del más antiguo al más reciente)"""
+        inicio = self._h_inicio
+        for i in chain(range(inicio, len(self._h_datos)), range(inicio)):
+            yield {
+                "accion": _ACCIONES_HISTORIAL[self._h_accion[i]],
+                "datos": self._h_datos[i],
+                "timestamp": _formatear_ts(self._h_ts[i])
+            }
     
     # ══════════════════════════════════════════════════════════
     # EXPORTACIÓN E IMPORTACIÓN
@@ -595,14 +853,31 @@ class Glosario:
     
     def exportar_json(self) -> str:
         """Exportar glosario a JSON"""
-        data = {
+        if orjson is not None:
+            return orjson.dumps(self._datos_json(), option=orjson.OPT_INDENT_2).decode("utf-8")
+        buf = io.StringIO()
+        self.escribir_json(buf)
+        return buf.getvalue()
+    
+    def escribir_json(self, destino: TextIO) -> None:
+        """Escribir glosario en JSON directamente sobre un flujo"""
+        if orjson is not None:
+            destino.write(self.exportar_json())
+        else:
+            json.dump(self._datos_json(), destino, ensure_ascii=False, indent=2)
+    
+    def _datos_json(self) -> Dict[str, Any]:
+        """Estructura serializable del glosario"""
+        categorias = _NOMBRE_CATEGORIA
+        estados = _NOMBRE_STATUS
+        return {
             "entradas": {
                 token: {
-                    "categoria": e.categoria.name,
+                    "categoria": categorias[e.categoria],
                     "token_tgt": e.token_tgt,
-                    "status": e.status.name,
+                    "status": estados[e.status],
                     "margen": e.margen,
-                    "ocurrencias": e.ocurrencias,
+                    "ocurrencias": e.ocurrencias.tolist(),
                     "etiqueta": e.etiqueta
                 }
                 for token, e in self._entradas.items()
@@ -612,60 +887,69 @@ class Glosario:
                     "src": loc.src,
                     "tgt": loc.tgt,
                     "componentes": loc.componentes,
-                    "posiciones": loc.posiciones
+                    "posiciones": loc.posiciones.tolist()
                 }
                 for loc_id, loc in self._locuciones.items()
             },
             "sellado": self._sellado,
             "exportado": datetime.now().isoformat()
         }
-        return json.dumps(data, ensure_ascii=False, indent=2)
     
     def exportar_txt(self) -> str:
         """Exportar glosario a texto plano"""
-        lineas = ["GLOSARIO", "=" * 40, ""]
+        buf = io.StringIO()
+        self.escribir_txt(buf)
+        return buf.getvalue()
+    
+    def escribir_txt(self, destino: TextIO) -> None:
+        """Escribir glosario en texto plano directamente sobre un flujo"""
+        destino.write(f"GLOSARIO\n{_REGLA_EXPORTACION}\n")
         
-        for entrada in self.obtener_entradas_por_margen():
-            tgt = entrada.token_tgt or "[PENDIENTE]"
-            linea = f"{tgt} ({entrada.token_src}) [{entrada.categoria.name}]"
-            if entrada.etiqueta:
-                linea += f" [{entrada.etiqueta}]"
-            lineas.append(linea)
+        for entrada in self._entradas_por_margen():
+            destino.write(f"\n{entrada.linea_listado()}")
         
         if self._locuciones:
-            lineas.extend(["", "LOCUCIONES", "-" * 40, ""])
+            destino.write(f"\n\nLOCUCIONES\n{_SEPARADOR_ALTERNATIVA}\n")
             for loc in self._locuciones.values():
-                lineas.append(f"{loc.tgt or '[PENDIENTE]'} ← {loc.src}")
-        
-        return "\n".join(lineas)
+                destino.write(f"\n{loc.tgt or '[PENDIENTE]'} ← {loc.src}")
     
     def exportar_csv(self) -> str:
         """Exportar glosario a CSV"""
-        lineas = ["token_src,token_tgt,categoria,status,margen,etiqueta"]
-        
-        for token, entrada in self._entradas.items():
-            linea = f'"{token}","{entrada.token_tgt or ""}",{entrada.categoria.name},{entrada.status.name},{entrada.margen},"{entrada.etiqueta or ""}"'
-            lineas.append(linea)
-        
-        return "\n".join(lineas)
+        buf = io.StringIO()
+        self.escribir_csv(buf)
+        return buf.getvalue()
+    
+    def escribir_csv(self, destino: TextIO) -> None:
+        """Escribir glosario en CSV directamente sobre un flujo"""
+        categorias = _NOMBRE_CATEGORIA
+        estados = _NOMBRE_STATUS
+        escritor = csv.writer(destino, lineterminator="\n")
+        escritor.writerow(("token_src", "token_tgt", "categoria", "status", "margen", "etiqueta"))
+        escritor.writerows(
+            (token, e.token_tgt or "", categorias[e.categoria], estados[e.status], e.margen, e.etiqueta or "")
+            for token, e in self._entradas.items()
+        )
     
     @classmethod
     def importar_json(cls, json_str: str) -> 'Glosario':
         """Importar glosario desde JSON"""
-        data = json.loads(json_str)
+        data = orjson.loads(json_str) if orjson is not None else json.loads(json_str)
         glosario = cls()
         
-        for token, e_data in data.get("entradas", {}).items():
-            entrada = EntradaGlosario(
+        categorias = _CATEGORIA_POR_NOMBRE
+        estados = _STATUS_POR_NOMBRE
+        glosario._cargar_entradas({
+            token: EntradaGlosario(
                 token_src=token,
-                categoria=TokenCategoria[e_data["categoria"]],
+                categoria=categorias[e_data["categoria"]],
                 token_tgt=e_data.get("token_tgt"),
-                status=TokenStatus[e_data["status"]],
+                status=estados[e_data["status"]],
                 margen=e_data.get("margen", 0),
-                ocurrencias=e_data.get("ocurrencias", []),
+                ocurrencias=array('i', e_data.get("ocurrencias", ())),
                 etiqueta=e_data.get("etiqueta")
             )
-            glosario._entradas[token] = entrada
+            for token, e_data in data.get("entradas", {}).items()
+        })
         
         for loc_id, l_data in data.get("locuciones", {}).items():
             locucion = Locucion(
@@ -675,7 +959,7 @@ class Glosario:
                 componentes=l_data["componentes"],
                 posiciones=l_data["posiciones"]
             )
-            glosario._locuciones[loc_id] = locucion
+            glosario._registrar_locucion(locucion)
         
         glosario._sellado = data.get("sellado", False)
         
@@ -687,58 +971,47 @@ class Glosario:
     
     def formatear_glosario(self, limite: int = 50, pagina: int = 1) -> str:
         """Formatear glosario para presentación"""
-        entradas = self.obtener_entradas_por_margen()
+        entradas = self._entradas_por_margen()
         total = len(entradas)
         total_paginas = (total + limite - 1) // limite
         
         inicio = (pagina - 1) * limite
         fin = min(inicio + limite, total)
         
-        lineas = [
-            "═" * 50,
-            f"GLOSARIO [{inicio+1}-{fin} de {total}]",
-            "═" * 50,
-            ""
-        ]
+        buf = io.StringIO()
+        escribir = buf.write
+        escribir(f"{_SEPARADOR}\nGLOSARIO [{inicio+1}-{fin} de {total}]\n{_SEPARADOR}\n\n")
         
         for entrada in entradas[inicio:fin]:
-            tgt = entrada.token_tgt or "[PENDIENTE]"
-            linea = f"  {tgt} ({entrada.token_src}) [{entrada.categoria.name}]"
-            if entrada.etiqueta:
-                linea += f" [{entrada.etiqueta}]"
-            lineas.append(linea)
+            escribir(f"  {entrada.linea_listado()}\n")
         
-        lineas.append("")
+        escribir("\n")
         if total_paginas > 1:
-            lineas.append(f"[Página {pagina}/{total_paginas}] — 'más' para continuar")
-        lineas.append("═" * 50)
+            escribir(f"[Página {pagina}/{total_paginas}] — 'más' para continuar\n")
+        escribir(_SEPARADOR)
         
-        return "\n".join(lineas)
+        return buf.getvalue()
     
     def formatear_locuciones(self) -> str:
         """Formatear locuciones para presentación"""
         if not self._locuciones:
             return "No hay locuciones registradas."
         
-        lineas = [
-            "═" * 50,
-            "LOCUCIONES DETECTADAS",
-            "═" * 50,
-            ""
-        ]
+        buf = io.StringIO()
+        escribir = buf.write
+        escribir(f"{_SEPARADOR}\nLOCUCIONES DETECTADAS\n{_SEPARADOR}\n\n")
         
         for loc in self._locuciones.values():
-            lineas.extend([
-                f"  ID: {loc.id}",
-                f"  Fuente: {loc.src}",
-                f"  Traducción: {loc.tgt or '[PENDIENTE]'}",
-                f"  Componentes: {', '.join(loc.componentes)} [BLOQUEADOS]",
-                f"  Posiciones: {loc.posiciones}",
-                ""
-            ])
-        
-        lineas.append("═" * 50)
-        return "\n".join(lineas)
+            escribir(
+                f"  ID: {loc.id}\n"
+                f"  Fuente: {loc.src}\n"
+                f"  Traducción: {loc.tgt or '[PENDIENTE]'}\n"
+                f"  Componentes: {', '.join(loc.componentes)} [BLOQUEADOS]\n"
+                f"  Posiciones: {loc.posiciones.tolist()}\n\n"
+            )
+        
+        escribir(_SEPARADOR)
+        return buf.getvalue()
     
     def formatear_alternativas(self) -> str:
         """Formatear alternativas para presentación"""
@@ -747,27 +1020,22 @@ class Glosario:
         if not alternativas:
             return "No hay términos de alto margen."
         
-        lineas = [
-            "═" * 50,
-            "ALTERNATIVAS (Alto margen de decisión)",
-            "═" * 50,
-            ""
-        ]
+        buf = io.StringIO()
+        escribir = buf.write
+        escribir(f"{_SEPARADOR}\nALTERNATIVAS (Alto margen de decisión)\n{_SEPARADOR}\n\n")
         
         for entrada in alternativas:
-            lineas.extend([
-                f"TÉRMINO: {entrada.token_src}",
-                f"TRADUCCIÓN ACTUAL: {entrada.token_tgt or '[PENDIENTE]'}",
-                f"MARGEN: {entrada.margen}",
-                f"ETIQUETA: {entrada.etiqueta or 'N/A'}",
-                "",
-                "Para cambiar: [ACTUALIZA {} = nueva_traducción]".format(entrada.token_src),
-                "-" * 40,
-                ""
-            ])
-        
-        lineas.append("═" * 50)
-        return "\n".join(lineas)
+            escribir(
+                f"TÉRMINO: {entrada.token_src}\n"
+                f"TRADUCCIÓN ACTUAL: {entrada.token_tgt or '[PENDIENTE]'}\n"
+                f"MARGEN: {entrada.margen}\n"
+                f"ETIQUETA: {entrada.etiqueta or 'N/A'}\n\n"
+                f"Para cambiar: [ACTUALIZA {entrada.token_src} = nueva_traducción]\n"
+                f"{_SEPARADOR_ALTERNATIVA}\n\n"
+            )
+        
+        escribir(_SEPARADOR)
+        return buf.getvalue()
 
 
 # ══════════════════════════════════════════════════════════════
@@ -2,6 +2,15 @@
 # main.py — ORQUESTACIÓN PRINCIPAL
 # ══════════════════════════════════════════════════════════════
 
+import queue
+from bisect import bisect_left
+import sys
+import threading
+from functools import cached_property
+from itertools import chain
+from operator import itemgetter
+from typing import Callable, Dict, List, Iterable, Iterator, Tuple, Optional, Mapping
+
 from constants import (
     TokenStatus, TokenCategoria, CategoriaGramatical,
     ModoSalida, ModoTransliteracion, ConsultaCodigo
@@ -9,17 +18,17 @@ from constants import (
 from config import obtener_config, ConfiguracionSistema
 from models import (
     SlotN, SlotP, MatrizFuente, MatrizTarget,
-    MorfologiaFuente, EstadoProceso
+    MorfologiaFuente, EstadoProceso, Locucion
 )
 from glossary import Glosario, RegistroIncompletoError, SinonimiaError
 from core import Core, CoreResult
-from nucleos import ProcesadorNucleos, crear_slot_n
-from particulas import ProcesadorParticulas, crear_slot_p
+from nucleos import ProcesadorNucleos
+from particulas import ProcesadorParticulas
 from casos_dificiles import ProcesadorCasosDificiles
 from reparacion import ReparadorSintactico
 from formacion import ControladorFormacionLexica
 from renderizado import ControladorRenderizado
-from utils import Logger, Tokenizador, ClasificadorGramatical
+from utils import Logger, Tokenizador, ClasificadorGramatical, GestorArchivos
 from consultas import GestorConsultas, obtener_gestor_consultas
 from comandos import ProcesadorComandos, obtener_procesador_comandos
 
@@ -47,32 +56,45 @@ class SistemaTraduccion:
       P11: Comandos
     """
     
+    # Desde este número de oraciones, Mtx_S se construye en un hilo
+    # productor mientras Core procesa la oración anterior
+    _UMBRAL_PIPELINE = 32
+    _TAMANO_COLA_PIPELINE = 8
+    _FIN_PIPELINE = object()
+    
+    # Formato → método de Glosario para exportar/importar
+    _EXPORTADORES = {
+        "json": Glosario.exportar_json,
+        "csv": Glosario.exportar_csv,
+        "txt": Glosario.exportar_txt,
+    }
+    _IMPORTADORES = {
+        "json": Glosario.importar_json,
+    }
+    
+    # Mínimo de oraciones entre publicaciones de progreso
+    _PASO_MIN_PROGRESO = 16
+    
+    # Entradas triviales que se resuelven directamente desde el glosario
+    _MAX_CARACTERES_ATAJO = 64
+    _MAX_TOKENS_ATAJO = 2
+    
     def __init__(self):
         # Configuración
         self.config = obtener_config()
         
-        # Componentes principales
-        self.glosario = Glosario()
-        self.core = Core(self.glosario)
-        
         # Procesadores
         self.proc_nucleos = ProcesadorNucleos()
         self.proc_particulas = ProcesadorParticulas()
-        self.proc_casos_dificiles = ProcesadorCasosDificiles()
-        self.reparador = ReparadorSintactico()
-        self.formacion = ControladorFormacionLexica()
-        self.renderizado = ControladorRenderizado()
+        # P6, P7, P9 y P10 se crean en su primer uso (ver propiedades)
         
         # Sistema de consultas y comandos
         self.gestor_consultas = obtener_gestor_consultas()
         self.proc_comandos = obtener_procesador_comandos()
-        self.proc_comandos.set_glosario(self.glosario)
         
-        # Conectar procesadores
-        self.core.set_procesador_nucleos(self.proc_nucleos)
-        self.core.set_procesador_particulas(self.proc_particulas)
-        self.core.set_reparador(self.reparador)
-        self.proc_nucleos.set_procesador_casos_dificiles(self.proc_casos_dificiles)
+        # Componentes principales: glosario y Core conectado a él
+        self.glosario: Optional[Glosario] = None
+        self._conectar_glosario(Glosario())
         
         # Estado
         self.estado = EstadoProceso()
@@ -85,8 +107,14 @@ class SistemaTraduccion:
         self._texto_fuente: str = ""
         self._texto_traducido: str = ""
         self._oraciones_fuente: List[str] = []
+        self._tokens_por_oracion: List[List[str]] = []
         self._oraciones_traducidas: List[str] = []
         
+        # Locuciones del glosario compartidas por todas las Mtx_S
+        self._vista_locuciones: Mapping[str, Locucion] = {}
+        self._locuciones_ordenadas: List[Tuple[int, Locucion]] = []
+        self._inicios_locuciones: List[int] = []
+        
         # Callbacks de control
         self._configurar_callbacks()
     
@@ -97,6 +125,55 @@ class SistemaTraduccion:
         self.proc_comandos.set_callback("FORZAR", self._on_forzar)
         self.proc_comandos.set_callback("REINICIAR", self._on_reiniciar)
     
+    # ══════════════════════════════════════════════════════════
+    # PROCESADORES DE CREACIÓN DIFERIDA
+    # ══════════════════════════════════════════════════════════
+    
+    @cached_property
+    def proc_casos_dificiles(self) -> ProcesadorCasosDificiles:
+        """P6: Casos difíciles (se conecta a P4 al crearse)"""
+        proc = ProcesadorCasosDificiles()
+        self.proc_nucleos.set_procesador_casos_dificiles(proc)
+        return proc
+    
+    @cached_property
+    def reparador(self) -> ReparadorSintactico:
+        """P7: Reparación sintáctica (se conecta a Core al crearse)"""
+        reparador = ReparadorSintactico()
+        self.core.set_reparador(reparador)
+        return reparador
+    
+    @cached_property
+    def formacion(self) -> ControladorFormacionLexica:
+        """P9: Formación léxica"""
+        return ControladorFormacionLexica()
+    
+    @cached_property
+    def renderizado(self) -> ControladorRenderizado:
+        """P10: Renderizado"""
+        return ControladorRenderizado()
+    
+    def _conectar_glosario(self, glosario: Glosario) -> None:
+        """
+        Único punto de cableado del glosario
+        
+        Un glosario nuevo recibe un Core nuevo; si es el mismo (reinicio),
+        Core se vacía en el sitio. En ambos casos se actualizan los
+        comandos. Los procesadores diferidos ya creados se conservan (P6
+        guarda sus consultas pendientes); P7 se reconecta al Core nuevo.
+        """
+        if glosario is self.glosario:
+            self.core.reset()
+        else:
+            self.glosario = glosario
+            self.core = Core(glosario)
+            self.core.set_procesador_nucleos(self.proc_nucleos)
+            self.core.set_procesador_particulas(self.proc_particulas)
+            reparador = self.__dict__.get("reparador")
+            if reparador is not None:
+                self.core.set_reparador(reparador)
+        self.proc_comandos.set_glosario(glosario)
+    
     # ══════════════════════════════════════════════════════════
     # FLUJO PRINCIPAL
     # ══════════════════════════════════════════════════════════
@@ -111,39 +188,70 @@ class SistemaTraduccion:
         self.logger.info("Iniciando traducción")
         self._texto_fuente = texto_fuente
         
+        # Atajo: entrada corta con todos sus tokens ya asignados
+        traduccion_directa = self._traducir_desde_glosario(texto_fuente)
+        if traduccion_directa is not None:
+            self._oraciones_fuente = [texto_fuente]
+            self._tokens_por_oracion = [Tokenizador.tokenizar(texto_fuente)]
+            self._oraciones_traducidas = [traduccion_directa]
+            self._texto_traducido = traduccion_directa
+            self.estado.actualizar_progreso(1, 1)
+            self.estado.fase_actual = "COMPLETADO"
+            self.logger.info("Traducción resuelta desde glosario")
+            return traduccion_directa
+        
         try:
             # P10.A: Limpieza
             self.estado.fase_actual = "P10.A: Limpieza"
             resultado_limpieza = self.renderizado.limpiar_texto(texto_fuente)
             texto_limpio = resultado_limpieza.texto_limpio
-            self.logger.info(f"Limpieza completada: {len(resultado_limpieza.ruido_eliminado)} elementos eliminados")
+            self.logger.info("Limpieza completada: %d elementos eliminados", len(resultado_limpieza.ruido_eliminado))
             
-            # Dividir en oraciones
-            self._oraciones_fuente = Tokenizador.dividir_oraciones(texto_limpio)
+            # Dividir en oraciones y tokenizar en una sola pasada
+            self._tokens_por_oracion, self._oraciones_fuente = (
+                Tokenizador.tokenizar_con_oraciones(texto_limpio)
+            )
             self.estado.total_oraciones = len(self._oraciones_fuente)
-            self.logger.info(f"Oraciones detectadas: {self.estado.total_oraciones}")
+            self.logger.info("Oraciones detectadas: %d", self.estado.total_oraciones)
             
             # P8.A: Análisis léxico (detección + tokenización + registro)
             self.estado.fase_actual = "P8.A: Análisis léxico"
-            self._fase_analisis_lexico(texto_limpio)
+            self._fase_analisis_lexico(texto_limpio, self._tokens_por_oracion)
             
             # Punto de consulta: Pre-traducción
-            if self.gestor_consultas.hay_pendientes():
-                self._procesar_consultas()
+            self._procesar_consultas()
+            
+            self._indexar_locuciones()
             
             # P3-P7: Traducción de cada oración
             self.estado.fase_actual = "P3-P7: Traducción"
+            # El primer acceso crea P6/P7 y los conecta (ver propiedades)
+            self.proc_casos_dificiles
+            self.reparador
             self._oraciones_traducidas = []
+            depurar = self.logger.habilitado("DEBUG")
+            total = self.estado.total_oraciones
+            # Publicar el progreso cada 1% o cada 16 oraciones (lo mayor)
+            paso = max(self._PASO_MIN_PROGRESO, total // 100)
             
-            for i, oracion in enumerate(self._oraciones_fuente):
-                if self.estado.pausado:
-                    self.logger.info("Proceso pausado")
-                    break
-                
-                self.logger.debug(f"Traduciendo oración {i+1}/{self.estado.total_oraciones}")
-                oracion_traducida = self._traducir_oracion(oracion)
-                self._oraciones_traducidas.append(oracion_traducida)
-                self.estado.oraciones_traducidas = i + 1
+            matrices = self._iterar_matrices_fuente()
+            try:
+                for i, oracion, mtx_s in matrices:
+                    if self.estado.pausado:
+                        self.logger.info("Proceso pausado")
+                        break
+                    
+                    if depurar:
+                        self.logger.debug("Traduciendo oración %d/%d", i + 1, total)
+                    oracion_traducida = self._traducir_oracion(oracion, mtx_s)
+                    self._oraciones_traducidas.append(oracion_traducida)
+                    if (i + 1) % paso == 0:
+                        self.estado.actualizar_progreso(i + 1, total)
+            finally:
+                # Cerrar ya el iterador (pausa o error): su finally drena la
+                # cola y espera al hilo productor, sin depender del GC
+                matrices.close()
+                self.estado.actualizar_progreso(len(self._oraciones_traducidas), total)
             
             # P10.B: Presentación
             self.estado.fase_actual = "P10.B: Presentación"
@@ -155,20 +263,60 @@ class SistemaTraduccion:
             return self._texto_traducido
             
         except RegistroIncompletoError as e:
-            self.logger.error(f"FALLO CRÍTICO: Registro incompleto - {e}")
+            self.logger.error("FALLO CRÍTICO: Registro incompleto - %s", e)
             self.estado.errores_criticos += 1
             raise
         
         except SinonimiaError as e:
-            self.logger.error(f"FALLO CRÍTICO: Sinonimia - {e}")
+            self.logger.error("FALLO CRÍTICO: Sinonimia - %s", e)
             self.estado.errores_criticos += 1
             raise
         
         except Exception as e:
-            self.logger.error(f"Error inesperado: {e}")
+            self.logger.error("Error inesperado: %s", e)
             raise
     
-    def _fase_analisis_lexico(self, texto: str) -> None:
+    def traducir_stream(self, fragmentos: Iterable[str]) -> Iterator[str]:
+        """
+        Traducir un texto fragmento a fragmento
+        
+        Cada fragmento pasa por el flujo completo de `traducir`; el
+        glosario se conserva entre fragmentos, de modo que la
+        traducción de cada token es la misma en todo el texto. Las
+        posiciones de P8 (ocurrencias, locuciones) se cuentan desde el
+        inicio de cada fragmento, no del texto completo.
+        """
+        for fragmento in fragmentos:
+            yield self.traducir(fragmento)
+            if self.estado.pausado:
+                return
+    
+    def _traducir_desde_glosario(self, texto_fuente: str) -> Optional[str]:
+        """
+        Resolver entradas triviales sin P8.A ni matrices
+        
+        Returns:
+            Traducción si la entrada es corta y todos sus tokens tienen
+            traducción ASIGNADA en el glosario; None en otro caso
+        """
+        if len(texto_fuente) >= self._MAX_CARACTERES_ATAJO:
+            return None
+        
+        tokens = Tokenizador.tokenizar(texto_fuente)
+        if not tokens or len(tokens) > self._MAX_TOKENS_ATAJO:
+            return None
+        
+        traducciones = []
+        for token in tokens:
+            entrada = self.glosario.obtener_entrada(token)
+            if not entrada or entrada.status != TokenStatus.ASIGNADO or not entrada.token_tgt:
+                return None
+            traducciones.append(entrada.token_tgt)
+        
+        return " ".join(traducciones)
+    
+    def _fase_analisis_lexico(self, texto: str,
+                              tokens_por_oracion: Optional[List[List[str]]] = None) -> None:
         """
         P8.A: Análisis léxico completo
         
@@ -177,8 +325,11 @@ class SistemaTraduccion:
         3. Registro inicial
         4. Verificación de completitud
         """
-        # Tokenizar
-        tokens = Tokenizador.tokenizar(texto)
+        # Tokenizar (o reutilizar la tokenización por oración)
+        if tokens_por_oracion is None:
+            tokens = Tokenizador.tokenizar(texto)
+        else:
+            tokens = [token for tokens_oracion in tokens_por_oracion for token in tokens_oracion]
         
         # Clasificar tokens
         tokens_clasificados = []
@@ -195,22 +346,76 @@ class SistemaTraduccion:
         self.estado.glosario_asignadas = stats["asignadas"]
         self.estado.glosario_pendientes = stats["pendientes"]
         
-        self.logger.info(f"Glosario: {stats['total']} entradas, {stats['locuciones']} locuciones")
+        self.logger.info("Glosario: %d entradas, %d locuciones", stats["total"], stats["locuciones"])
     
-    def _traducir_oracion(self, oracion: str) -> str:
+    def _iterar_matrices_fuente(self) -> Iterator[Tuple[int, str, MatrizFuente]]:
+        """
+        Iterar (índice, oración, Mtx_S) sobre las oraciones fuente
+        
+        Con textos largos, un hilo productor construye Mtx_S de la oración
+        N+1 mientras Core procesa la oración N. La cola acotada limita las
+        matrices en memoria; las locuciones del glosario no cambian durante
+        P3-P7, así que construirlas por adelantado es seguro.
+        """
+        oraciones = self._oraciones_fuente
+        tokens_por_oracion = self._tokens_por_oracion
+        
+        if len(oraciones) < self._UMBRAL_PIPELINE:
+            for i, oracion in enumerate(oraciones):
+                yield i, oracion, self._crear_matriz_fuente(oracion, tokens_por_oracion[i])
+            return
+        
+        cola: queue.Queue = queue.Queue(maxsize=self._TAMANO_COLA_PIPELINE)
+        detener = threading.Event()
+        
+        def productor() -> None:
+            try:
+                for i, oracion in enumerate(oraciones):
+                    cola.put((i, oracion, self._crear_matriz_fuente(oracion, tokens_por_oracion[i])))
+                    if detener.is_set():
+                        return
+            except Exception as e:
+                cola.put(e)
+                return
+            cola.put(self._FIN_PIPELINE)
+        
+        hilo = threading.Thread(target=productor, name="P8-MtxS", daemon=True)
+        hilo.start()
+        
+        try:
+            while True:
+                item = cola.get()
+                if item is self._FIN_PIPELINE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Liberar al productor si el consumidor se detuvo antes (pausa/error)
+            detener.set()
+            while hilo.is_alive():
+                try:
+                    cola.get(timeout=0.05)
+                except queue.Empty:
+                    pass
+            hilo.join()
+    
+    def _traducir_oracion(self, oracion: str,
+                          mtx_s: Optional[MatrizFuente] = None) -> str:
         """
         Traducir una oración individual
         
         P3 → P4/P5 → P6 → P7 → resultado
         """
         # Crear matriz fuente
-        mtx_s = self._crear_matriz_fuente(oracion)
+        if mtx_s is None:
+            mtx_s = self._crear_matriz_fuente(oracion)
         
         # Procesar con Core
         resultado = self.core.procesar_oracion(mtx_s)
         
         if not resultado.exito:
-            self.logger.warning(f"Error en traducción: {resultado.mensaje}")
+            self.logger.warning("Error en traducción: %s", resultado.mensaje)
             # Intentar serializar lo que haya
             if resultado.mtx_t:
                 return self.core.serializar_resultado()
@@ -219,42 +424,67 @@ class SistemaTraduccion:
         # Serializar resultado
         return self.core.serializar_resultado()
     
-    def _crear_matriz_fuente(self, oracion: str) -> MatrizFuente:
-        """Crear matriz fuente desde oración"""
-        mtx = MatrizFuente()
-        tokens = Tokenizador.tokenizar(oracion)
+    def _indexar_locuciones(self) -> None:
+        """
+        Preparar las locuciones del glosario para P3-P7
         
-        for i, token in enumerate(tokens):
-            # Agregar celda
-            mtx.agregar_celda(token, i)
-            
-            # Clasificar y crear slot
+        Las locuciones no cambian durante la traducción: cada Mtx_S guarda
+        una vista compartida en lugar de una copia, y solo se recorren las
+        locuciones cuya primera posición cae dentro de la oración. El orden
+        por posición solo sirve para elegir candidatas; cada una lleva su
+        orden de alta en el glosario, que decide ante solapamientos.
+        """
+        self._vista_locuciones = self.glosario.vista_locuciones()
+        self._locuciones_ordenadas = sorted(
+            (
+                (orden, loc)
+                for orden, loc in enumerate(self._vista_locuciones.values())
+                if loc.posiciones
+            ),
+            key=lambda par: par[1].primera_posicion()
+        )
+        self._inicios_locuciones = [
+            loc.primera_posicion() for _, loc in self._locuciones_ordenadas
+        ]
+    
+    def _crear_matriz_fuente(self, oracion: str,
+                             tokens: Optional[List[str]] = None) -> MatrizFuente:
+        """Crear matriz fuente desde oración (o sus tokens ya extraídos)"""
+        if tokens is None:
+            tokens = Tokenizador.tokenizar(oracion)
+        
+        # Clasificar en arrays paralelos y construir la matriz en bloque
+        cats = []
+        cat_grams = []
+        for token in tokens:
             cat, cat_gram = ClasificadorGramatical.clasificar(token)
-            
-            if cat == TokenCategoria.NUCLEO:
-                slot = crear_slot_n(token, cat_gram, i)
-                mtx.agregar_slot_n(slot)
-            else:
-                slot = crear_slot_p(token, cat_gram, i)
-                mtx.agregar_slot_p(slot)
+            cats.append(cat)
+            cat_grams.append(cat_gram)
+        
+        mtx = MatrizFuente.from_arrays(tokens, cats, cat_grams)
         
-        # Agregar locuciones del glosario
-        for loc_id, loc in self.glosario.obtener_locuciones().items():
-            mtx.agregar_locucion(loc)
+        # Locuciones del glosario por referencia
+        # (candidatas por posición, aplicadas en el orden de alta del glosario)
+        fin = bisect_left(self._inicios_locuciones, len(tokens))
+        candidatas = sorted(self._locuciones_ordenadas[:fin], key=itemgetter(0))
+        mtx.set_locuciones_view(self._vista_locuciones, [loc for _, loc in candidatas])
         
         return mtx
     
     def _procesar_consultas(self) -> None:
         """Procesar consultas pendientes"""
-        self.estado.consultas_pendientes = len(self.gestor_consultas.obtener_pendientes())
+        pendientes = self.gestor_consultas.obtener_pendientes()
+        self.estado.consultas_pendientes = len(pendientes)
+        if not pendientes:
+            return
         
         if self.config.auto_decidir_timeout:
             # Aplicar recomendaciones automáticamente
-            self.gestor_consultas.aplicar_recomendaciones_pendientes()
+            self.gestor_consultas.aplicar_recomendaciones(pendientes)
             self.logger.info("Consultas resueltas automáticamente")
         else:
             # Esperar respuesta del usuario (en modo interactivo)
-            texto = self.gestor_consultas.formatear_consultas_bloque()
+            texto = self.gestor_consultas.formatear_consultas_bloque(pendientes)
             print(texto)
     
     # ══════════════════════════════════════════════════════════
@@ -277,13 +507,10 @@ class SistemaTraduccion:
     
     def _on_reiniciar(self) -> None:
         """Callback para reiniciar"""
-        self.glosario = Glosario()
-        self.core = Core(self.glosario)
-        self.core.set_procesador_nucleos(self.proc_nucleos)
-        self.core.set_procesador_particulas(self.proc_particulas)
-        self.core.set_reparador(self.reparador)
+        # Glosario y Core se vacían en el sitio: las referencias siguen siendo válidas
+        self.glosario.reset()
+        self._conectar_glosario(self.glosario)
         self.estado = EstadoProceso()
-        self.proc_comandos.set_glosario(self.glosario)
         self.proc_comandos.estado = self.estado
         self.logger.info("Sistema reiniciado")
     
@@ -305,24 +532,16 @@ class SistemaTraduccion:
         return self.estado.formatear()
     
     def exportar_glosario(self, formato: str = "json") -> str:
-        """Exportar glosario"""
-        if formato == "json":
-            return self.glosario.exportar_json()
-        elif formato == "csv":
-            return self.glosario.exportar_csv()
-        return self.glosario.exportar_txt()
+        """Exportar glosario (formato desconocido → txt)"""
+        return self._EXPORTADORES.get(formato, Glosario.exportar_txt)(self.glosario)
     
     def importar_glosario(self, datos: str, formato: str = "json") -> bool:
         """Importar glosario"""
-        if formato == "json":
-            self.glosario = Glosario.importar_json(datos)
-            self.core = Core(self.glosario)
-            self.core.set_procesador_nucleos(self.proc_nucleos)
-            self.core.set_procesador_particulas(self.proc_particulas)
-            self.core.set_reparador(self.reparador)
-            self.proc_comandos.set_glosario(self.glosario)
-            return True
-        return False
+        importador = self._IMPORTADORES.get(formato)
+        if importador is None:
+            return False
+        self._conectar_glosario(importador(datos))
+        return True
     
     def obtener_traduccion(self) -> str:
         """Obtener texto traducido"""
@@ -337,6 +556,38 @@ class SistemaTraduccion:
 # INTERFAZ DE LÍNEA DE COMANDOS
 # ──────────────────────────────────────────────────────────────
 
+# Primera palabra de las entradas que se tratan como comando
+_COMMAND_WORDS: frozenset = frozenset({
+    "glosario", "locuciones", "alternativas", "decisiones",
+    "configuracion", "estado", "ayuda", "protocolos",
+    "actualiza", "añade", "elimina", "regla", "modo",
+    "pausa", "continuar", "forzar", "reiniciar",
+    "exportar", "importar"
+})
+
+# Entradas que terminan la sesión interactiva
+_EXIT_WORDS: frozenset = frozenset({"salir", "exit", "quit"})
+
+# Con entrada redirigida, volcar stdout cada N líneas
+_FLUSH_CADA = 32
+
+_BANNER = """
+╔══════════════════════════════════════════════════════════════╗
+║     SISTEMA DE TRADUCCIÓN ISOMÓRFICA — VERSIÓN PYTHON       ║
+║                                                              ║
+║  Comandos:                                                   ║
+║    [AYUDA]     - Ver comandos disponibles                    ║
+║    [GLOSARIO]  - Ver glosario actual                         ║
+║    [ESTADO]    - Ver estado del proceso                      ║
+║    traducir    - Modo traducción multilínea                  ║
+║    salir       - Terminar                                    ║
+║                                                              ║
+║  Ingrese texto directamente para traducir.                   ║
+╚══════════════════════════════════════════════════════════════╝
+
+"""
+
+
 class CLI:
     """
     Interfaz de línea de comandos
@@ -345,26 +596,33 @@ class CLI:
     def __init__(self):
         self.sistema = SistemaTraduccion()
         self._ejecutando = True
+        self._interactivo = sys.stdin.isatty()
+        
+        # Entradas especiales (palabra completa) → manejador
+        self._handlers: Dict[str, Callable[[str], None]] = {
+            palabra: self._cmd_salir for palabra in _EXIT_WORDS
+        }
+        self._handlers["traducir"] = self._cmd_modo_traduccion
     
     def ejecutar(self) -> None:
         """Ejecutar CLI interactivo"""
         self._mostrar_bienvenida()
         
-        while self._ejecutando:
+        for i, entrada in enumerate(self._leer_entradas(), 1):
+            if not self._interactivo and i % _FLUSH_CADA == 0:
+                sys.stdout.flush()
             try:
-                entrada = input("\n> ").strip()
+                entrada = entrada.strip()
                 
                 if not entrada:
                     continue
                 
                 # Comandos especiales
-                if entrada.lower() in ["salir", "exit", "quit"]:
-                    self._ejecutando = False
-                    print("¡Hasta pronto!")
-                    continue
-                
-                if entrada.lower() == "traducir":
-                    self._modo_traduccion()
+                handler = self._handlers.get(entrada.lower())
+                if handler:
+                    handler(entrada)
+                    if not self._ejecutando:
+                        break
                     continue
                 
                 # Procesar como comando
@@ -374,41 +632,62 @@ class CLI:
                 else:
                     # Texto para traducir
                     traduccion = self.sistema.traducir(entrada)
-                    print(f"\n═══ TRADUCCIÓN ═══\n{traduccion}\n══════════════════")
+                    self._mostrar_traduccion(traduccion)
                 
             except KeyboardInterrupt:
                 print("\n\nUse 'salir' para terminar.")
             except Exception as e:
                 print(f"Error: {e}")
+        
+        sys.stdout.flush()
+    
+    def _leer_entradas(self) -> Iterator[str]:
+        """
+        Leer entradas del usuario
+        
+        En terminal se muestra el prompt; con entrada redirigida se
+        itera sys.stdin directamente, sin prompt.
+        """
+        if not self._interactivo:
+            # Evitar que un byte inválido aborte el lote
+            if hasattr(sys.stdin, "reconfigure"):
+                sys.stdin.reconfigure(errors="replace")
+            yield from sys.stdin
+            return
+        
+        while self._ejecutando:
+            try:
+                yield input("\n> ")
+            except KeyboardInterrupt:
+                print("\n\nUse 'salir' para terminar.")
+            except EOFError:
+                return
     
     def _mostrar_bienvenida(self) -> None:
         """Mostrar mensaje de bienvenida"""
-        print("""
-╔══════════════════════════════════════════════════════════════╗
-║     SISTEMA DE TRADUCCIÓN ISOMÓRFICA — VERSIÓN PYTHON       ║
-║                                                              ║
-║  Comandos:                                                   ║
-║    [AYUDA]     - Ver comandos disponibles                    ║
-║    [GLOSARIO]  - Ver glosario actual                         ║
-║    [ESTADO]    - Ver estado del proceso                      ║
-║    traducir    - Modo traducción multilínea                  ║
-║    salir       - Terminar                                    ║
-║                                                              ║
-║  Ingrese texto directamente para traducir.                   ║
-╚══════════════════════════════════════════════════════════════╝
-""")
+        sys.stdout.write(_BANNER)
+        sys.stdout.flush()
+    
+    def _mostrar_traduccion(self, traduccion: str) -> None:
+        """Mostrar traducción en una sola escritura"""
+        sys.stdout.write(f"\n═══ TRADUCCIÓN ═══\n{traduccion}\n══════════════════\n")
+        if self._interactivo:
+            sys.stdout.flush()
+    
+    def _cmd_salir(self, entrada: str) -> None:
+        """Terminar la sesión"""
+        self._ejecutando = False
+        print("¡Hasta pronto!")
+    
+    def _cmd_modo_traduccion(self, entrada: str) -> None:
+        """Entrar en modo traducción multilínea"""
+        self._modo_traduccion()
     
     def _es_comando(self, texto: str) -> bool:
         """Verificar si es un comando"""
-        palabras_comando = [
-            "glosario", "locuciones", "alternativas", "decisiones",
-            "configuracion", "estado", "ayuda", "protocolos",
-            "actualiza", "añade", "elimina", "regla", "modo",
-            "pausa", "continuar", "forzar", "reiniciar",
-            "exportar", "importar"
-        ]
-        primera = texto.split()[0].lower() if texto else ""
-        return primera in palabras_comando
+        # Primera palabra delimitada por espacios: "Ayuda." o "glosario:" es texto
+        palabras = texto.split(None, 1)
+        return bool(palabras) and palabras[0].lower() in _COMMAND_WORDS
     
     def _modo_traduccion(self) -> None:
         """Modo traducción multilínea"""
@@ -424,7 +703,7 @@ class CLI:
         if lineas:
             texto = "\n".join(lineas)
             traduccion = self.sistema.traducir(texto)
-            print(f"\n═══ TRADUCCIÓN ═══\n{traduccion}\n══════════════════")
+            self._mostrar_traduccion(traduccion)
 
 
 # ──────────────────────────────────────────────────────────────
@@ -433,22 +712,35 @@ class CLI:
 
 def main():
     """Punto de entrada principal"""
-    import sys
-    
     if len(sys.argv) > 1:
         # Modo archivo
         archivo = sys.argv[1]
         if GestorArchivos.existe(archivo):
-            texto = GestorArchivos.cargar_texto(archivo)
-            if texto:
-                sistema = SistemaTraduccion()
-                traduccion = sistema.traducir(texto)
-                print(traduccion)
-                
-                # Guardar resultado
-                archivo_salida = archivo.rsplit('.', 1)[0] + "_traducido.txt"
-                GestorArchivos.guardar_texto(traduccion, archivo_salida)
-                print(f"\nTraducción guardada en: {archivo_salida}")
+            fragmentos = GestorArchivos.cargar_texto_stream(archivo)
+            # Leer el primer fragmento antes de crear la salida: una entrada
+            # ilegible o vacía no deja un *_traducido.txt vacío
+            try:
+                primero = next(fragmentos, None)
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"Error al cargar texto: {e}")
+                return
+            if primero is None:
+                return
+            
+            sistema = SistemaTraduccion()
+            archivo_salida = archivo.rsplit('.', 1)[0] + "_traducido.txt"
+            
+            # Traducir y guardar por fragmentos (un error de lectura posterior
+            # se propaga y no se anuncia la salida como guardada)
+            with open(archivo_salida, 'w', encoding='utf-8', buffering=1 << 20) as salida:
+                for n, traduccion in enumerate(sistema.traducir_stream(chain((primero,), fragmentos))):
+                    if n:
+                        salida.write("\n\n")
+                        print()
+                    salida.write(traduccion)
+                    print(traduccion)
+            
+            print(f"\nTraducción guardada en: {archivo_salida}")
         else:
             print(f"Archivo no encontrado: {archivo}")
     else:
@@ -5,26 +5,38 @@ Bloque 2/13: Modelos y Estructuras de Datos
 ════════════════════════════════════════════════════════════════
 """
 
+import time
+from array import array
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Any, Set
+from typing import List, Dict, Optional, Any, Set, Iterable, Mapping
 from datetime import datetime
 from enum import Enum
+from types import MappingProxyType
 
 # Importar desde constants.py
 from constants import (
     TokenStatus, TokenCategoria, CategoriaGramatical,
     FuncRole, ConsultaCodigo, FalloCritico, Reason,
-    DecisionOrigen, MARGEN_VALORES
+    DecisionOrigen, CeldaTipo, MARGEN_VALORES
 )
 
+# Separador de las consultas y errores formateados
+_SEPARADOR = "═" * 40
+
+
+def _datetime_desde_ns(ns: int) -> datetime:
+    """datetime local a partir de ns desde epoch (sin redondeo de float)"""
+    segundos, resto = divmod(ns, 1_000_000_000)
+    return datetime.fromtimestamp(segundos).replace(microsecond=resto // 1000)
+
 
 # ══════════════════════════════════════════════════════════════
 # ESTRUCTURAS DE SLOTS (P1.B.1)
 # ══════════════════════════════════════════════════════════════
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MorfologiaFuente:
-    """Morfología del token fuente"""
+    """Morfología del token fuente (inmutable: se comparte la vacía)"""
     numero: str = "singular"  # singular, dual, plural
     genero: Optional[str] = None
     persona: Optional[int] = None  # 1, 2, 3
@@ -34,7 +46,11 @@ class MorfologiaFuente:
     estado: Optional[str] = None  # definido, indefinido, constructo
 
 
-@dataclass
+# Morfología fuente por defecto, compartida por todos los slots sin rasgos
+MORFOLOGIA_FUENTE_VACIA = MorfologiaFuente()
+
+
+@dataclass(slots=True)
 class MorfologiaTarget:
     """Morfología aplicada al target"""
     numero: str = "singular"
@@ -44,7 +60,7 @@ class MorfologiaTarget:
     voz: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class SlotN:
     """
     Slot de Núcleo Léxico (P1.B.1)
@@ -80,7 +96,7 @@ class SlotN:
         self.status = TokenStatus.ASIGNADO
 
 
-@dataclass
+@dataclass(slots=True)
 class SlotP:
     """
     Slot de Partícula (P1.B.1)
@@ -113,7 +129,7 @@ class SlotP:
 # ESTRUCTURA DE LOCUCIÓN (P1.A.5)
 # ══════════════════════════════════════════════════════════════
 
-@dataclass
+@dataclass(slots=True)
 class Locucion:
     """
     Unidad compleja - Locución idiomática (P1.A.5)
@@ -122,54 +138,70 @@ class Locucion:
     id: str
     src: str  # Secuencia fuente completa
     componentes: List[str]  # Tokens individuales
-    posiciones: List[int]  # Posiciones en matriz
+    posiciones: 'array[int]'  # Posiciones en matriz (se acepta cualquier iterable de int)
     
     tgt: Optional[str] = None  # ETYM(A)-ETYM(B)-...
     status: str = "UNIDAD_COMPLEJA"
     
+    # Última generación: (partes, tgt generado)
+    _cache_tgt: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    
+    # Derivados de `posiciones` (fijas tras la construcción)
+    _posiciones_set: frozenset = field(default=frozenset(), init=False, repr=False, compare=False)
+    _primera_pos: int = field(default=-1, init=False, repr=False, compare=False)
+    
+    def __post_init__(self) -> None:
+        if not isinstance(self.posiciones, array):
+            self.posiciones = array('i', self.posiciones)
+        self._posiciones_set = frozenset(self.posiciones)
+        self._primera_pos = min(self.posiciones) if self.posiciones else -1
+    
     def generar_traduccion(self, traducciones_etym: Dict[str, str]) -> str:
         """
         Generar traducción formato ETYM(A)-ETYM(B)-ETYM(C)-...
         """
-        partes = []
-        for comp in self.componentes:
-            if comp in traducciones_etym:
-                partes.append(traducciones_etym[comp])
-            else:
-                # Si no hay traducción etimológica, usar el componente
-                partes.append(comp)
+        # Si no hay traducción etimológica, usar el componente;
+        # map(get, comps, comps) llama a get(comp, comp) sin marco Python
+        comps = self.componentes
+        partes = tuple(map(traducciones_etym.get, comps, comps))
+        
+        # Mismas partes y tgt sin modificar desde entonces: reutilizar
+        cache = self._cache_tgt
+        if cache is not None and cache[0] == partes and self.tgt is cache[1]:
+            return self.tgt
         
         self.tgt = "-".join(partes)
+        self._cache_tgt = (partes, self.tgt)
         return self.tgt
     
     def contiene_posicion(self, pos: int) -> bool:
-        return pos in self.posiciones
+        return pos in self._posiciones_set
     
     def primera_posicion(self) -> int:
-        return min(self.posiciones) if self.posiciones else -1
+        return self._primera_pos
 
 
 # ══════════════════════════════════════════════════════════════
 # ESTRUCTURAS DE MATRIZ (P1.B.1)
 # ══════════════════════════════════════════════════════════════
 
-@dataclass
+@dataclass(slots=True)
 class CeldaMatriz:
     """Celda individual de la matriz"""
     pos: int
     token_src: str
     token_tgt: Optional[str] = None
-    tipo: str = "normal"  # normal, inyeccion, nulo, absorbido, locucion
+    tipo: CeldaTipo = CeldaTipo.NORMAL
     slot: Optional[Any] = None  # SlotN o SlotP
     
     def es_absorbido(self) -> bool:
-        return self.tipo == "absorbido"
+        return self.tipo is CeldaTipo.ABSORBIDO
     
     def es_inyeccion(self) -> bool:
-        return self.tipo == "inyeccion"
+        return self.tipo is CeldaTipo.INYECCION
     
     def es_nulo(self) -> bool:
-        return self.tipo == "nulo"
+        return self.tipo is CeldaTipo.NULO
 
 
 class MatrizFuente:
@@ -182,7 +214,40 @@ class MatrizFuente:
         self.celdas: List[CeldaMatriz] = []
         self.slots_n: List[SlotN] = []
         self.slots_p: List[SlotP] = []
-        self.locuciones: Dict[str, Locucion] = {}
+        self.locuciones: Mapping[str, Locucion] = {}
+        # Posición → locución que la contiene (la primera registrada)
+        self._pos_a_locucion: Dict[int, Locucion] = {}
+        self._posiciones: Optional['array[int]'] = None
+    
+    @classmethod
+    def from_arrays(cls, tokens: List[str], cats: List[TokenCategoria],
+                    cat_grams: List[CategoriaGramatical],
+                    locuciones: Iterable[Locucion] = ()) -> 'MatrizFuente':
+        """
+        Construir Mtx_S en bloque desde arrays paralelos
+        
+        Args:
+            tokens: Token fuente por posición
+            cats: TokenCategoria por posición (NUCLEO → SlotN, resto → SlotP)
+            cat_grams: Categoría gramatical por posición
+            locuciones: Locuciones a registrar (bloquean sus componentes)
+        """
+        mtx = cls()
+        mtx.celdas = [CeldaMatriz(pos=i, token_src=t) for i, t in enumerate(tokens)]
+        
+        for celda, cat, cat_gram in zip(mtx.celdas, cats, cat_grams):
+            if cat == TokenCategoria.NUCLEO:
+                slot = SlotN(celda.token_src, cat_gram, MORFOLOGIA_FUENTE_VACIA, celda.pos)
+                mtx.slots_n.append(slot)
+            else:
+                slot = SlotP(celda.token_src, cat_gram, None, celda.pos)
+                mtx.slots_p.append(slot)
+            celda.slot = slot
+        
+        for locucion in locuciones:
+            mtx.agregar_locucion(locucion)
+        
+        return mtx
     
     def agregar_celda(self, token: str, pos: int) -> CeldaMatriz:
         celda = CeldaMatriz(pos=pos, token_src=token)
@@ -200,9 +265,40 @@ class MatrizFuente:
             self.celdas[slot.pos_index].slot = slot
     
     def agregar_locucion(self, locucion: Locucion) -> None:
+        if not isinstance(self.locuciones, dict):
+            # Vista compartida: copiar antes de modificar
+            self.locuciones = dict(self.locuciones)
+        anterior = self.locuciones.get(locucion.id)
         self.locuciones[locucion.id] = locucion
-        # Marcar componentes como bloqueados
+        if anterior is not None and anterior is not locucion:
+            # Mismo ID: el índice debe apuntar a la versión nueva
+            for pos, loc in self._pos_a_locucion.items():
+                if loc is anterior:
+                    self._pos_a_locucion[pos] = locucion
+        self._bloquear_componentes(locucion)
+    
+    def set_locuciones_view(self, mapping: Mapping[str, Locucion],
+                            relevantes: Optional[Iterable[Locucion]] = None) -> None:
+        """
+        Usar las locuciones del glosario por referencia, sin copiarlas
+        
+        Args:
+            mapping: Locuciones del glosario (se guarda una vista de solo lectura)
+            relevantes: Locuciones cuyas posiciones caen en esta matriz, en
+                        el orden de alta del glosario (ante solapamientos
+                        gana la primera); si se omite, se recorren todas
+        """
+        if not isinstance(mapping, MappingProxyType):
+            mapping = MappingProxyType(mapping)
+        self.locuciones = mapping
+        self._pos_a_locucion = {}
+        for locucion in (mapping.values() if relevantes is None else relevantes):
+            self._bloquear_componentes(locucion)
+    
+    def _bloquear_componentes(self, locucion: Locucion) -> None:
+        """Marcar componentes de la locución como bloqueados (e indexarlos)"""
         for pos in locucion.posiciones:
+            self._pos_a_locucion.setdefault(pos, locucion)
             if pos < len(self.celdas):
                 slot = self.celdas[pos].slot
                 if slot:
@@ -211,16 +307,74 @@ class MatrizFuente:
     def size(self) -> int:
         return len(self.celdas)
     
+    def posiciones(self) -> 'array[int]':
+        """Columna de posiciones (se reconstruye solo si cambian las celdas)"""
+        cache = self._posiciones
+        if cache is None or len(cache) != len(self.celdas):
+            cache = array('i', [celda.pos for celda in self.celdas])
+            self._posiciones = cache
+        return cache
+    
     def obtener_slot(self, pos: int) -> Optional[Any]:
         if 0 <= pos < len(self.celdas):
             return self.celdas[pos].slot
         return None
     
     def obtener_locucion_en_pos(self, pos: int) -> Optional[Locucion]:
-        for loc in self.locuciones.values():
-            if loc.contiene_posicion(pos):
-                return loc
-        return None
+        return self._pos_a_locucion.get(pos)
+
+
+class CeldaTarget:
+    """
+    Celda de Mtx_T vista sobre las columnas de la matriz
+    Misma interfaz que CeldaMatriz; lecturas y escrituras van a las columnas
+    """
+    __slots__ = ("_mtx", "_pos")
+    
+    def __init__(self, mtx: 'MatrizTarget', pos: int):
+        self._mtx = mtx
+        self._pos = pos
+    
+    @property
+    def pos(self) -> int:
+        return self._mtx.posiciones[self._pos]
+    
+    @property
+    def token_src(self) -> str:
+        return self._mtx.tokens_src[self._pos]
+    
+    @token_src.setter
+    def token_src(self, valor: str) -> None:
+        self._mtx.tokens_src[self._pos] = valor
+    
+    @property
+    def token_tgt(self) -> Optional[str]:
+        return self._mtx.tokens_tgt[self._pos]
+    
+    @token_tgt.setter
+    def token_tgt(self, valor: Optional[str]) -> None:
+        self._mtx.tokens_tgt[self._pos] = valor
+    
+    @property
+    def tipo(self) -> CeldaTipo:
+        return self._mtx.tipos[self._pos]
+    
+    @tipo.setter
+    def tipo(self, valor: CeldaTipo) -> None:
+        self._mtx.tipos[self._pos] = valor
+    
+    @property
+    def slot(self) -> None:
+        return None  # Mtx_T no lleva slots
+    
+    def es_absorbido(self) -> bool:
+        return self._mtx.tipos[self._pos] is CeldaTipo.ABSORBIDO
+    
+    def es_inyeccion(self) -> bool:
+        return self._mtx.tipos[self._pos] is CeldaTipo.INYECCION
+    
+    def es_nulo(self) -> bool:
+        return self._mtx.tipos[self._pos] is CeldaTipo.NULO
 
 
 class MatrizTarget:
@@ -228,32 +382,43 @@ class MatrizTarget:
     Mtx_T - Matriz Target (P1.B.1)
     Representación matricial de la oración traducida
     Size(Mtx_T) == Size(Mtx_S) - INMUTABLE
+    
+    Se guarda por columnas (una lista por atributo); `celdas` ofrece
+    la vista por celda para el código que recorre la matriz.
     """
     
     def __init__(self, size: int):
         self._size = size
-        self.celdas: List[CeldaMatriz] = [
-            CeldaMatriz(pos=i, token_src="", token_tgt=None) 
-            for i in range(size)
-        ]
+        self.posiciones = array('i', range(size))
+        self.tokens_src: List[str] = [""] * size
+        self.tokens_tgt: List[Optional[str]] = [None] * size
+        self.tipos: List[CeldaTipo] = [CeldaTipo.NORMAL] * size
         self.inyecciones: List[CeldaMatriz] = []  # Inyecciones no cuentan en size
+        self._celdas: Optional[List[CeldaTarget]] = None
+    
+    @property
+    def celdas(self) -> List[CeldaTarget]:
+        """Vista por celdas (se crea en el primer acceso)"""
+        if self._celdas is None:
+            self._celdas = [CeldaTarget(self, i) for i in range(self._size)]
+        return self._celdas
     
     def size(self) -> int:
         return self._size
     
-    def asignar(self, pos: int, token_tgt: str, tipo: str = "normal") -> None:
+    def asignar(self, pos: int, token_tgt: str, tipo: CeldaTipo = CeldaTipo.NORMAL) -> None:
         if 0 <= pos < self._size:
-            self.celdas[pos].token_tgt = token_tgt
-            self.celdas[pos].tipo = tipo
+            self.tokens_tgt[pos] = token_tgt
+            self.tipos[pos] = tipo
     
     def marcar_absorbido(self, pos: int) -> None:
         if 0 <= pos < self._size:
-            self.celdas[pos].tipo = "absorbido"
-            self.celdas[pos].token_tgt = "[ABSORBIDO]"
+            self.tipos[pos] = CeldaTipo.ABSORBIDO
+            self.tokens_tgt[pos] = "[ABSORBIDO]"
     
     def marcar_nulo(self, pos: int) -> None:
         if 0 <= pos < self._size:
-            self.celdas[pos].tipo = "nulo"
+            self.tipos[pos] = CeldaTipo.NULO
     
     def insertar_inyeccion(self, token: str, pos_referencia: int) -> None:
         """Insertar inyección (no afecta size)"""
@@ -261,13 +426,13 @@ class MatrizTarget:
             pos=pos_referencia,
             token_src="",
             token_tgt=token,
-            tipo="inyeccion"
+            tipo=CeldaTipo.INYECCION
         )
         self.inyecciones.append(celda)
     
     def obtener_token(self, pos: int) -> Optional[str]:
         if 0 <= pos < self._size:
-            return self.celdas[pos].token_tgt
+            return self.tokens_tgt[pos]
         return None
     
     def verificar_isomorfismo(self, mtx_s: MatrizFuente) -> bool:
@@ -275,18 +440,19 @@ class MatrizTarget:
         if self._size != mtx_s.size():
             return False
         
-        for i in range(self._size):
-            if self.celdas[i].pos != mtx_s.celdas[i].pos:
-                return False
-        
-        return True
+        # Comparación de columnas completa en C
+        return self.posiciones == mtx_s.posiciones()
 
 
 # ══════════════════════════════════════════════════════════════
 # ENTRADA DE GLOSARIO (P1.B.5)
 # ══════════════════════════════════════════════════════════════
 
-@dataclass
+# Tabla de márgenes por origen, con enteros y búsqueda ya enlazada
+_MARGEN_POR_ORIGEN: Dict[str, int] = {k: int(v) for k, v in MARGEN_VALORES.items()}
+_margen_por_origen = _MARGEN_POR_ORIGEN.get
+
+@dataclass(slots=True)
 class EntradaGlosario:
     """Entrada individual del glosario"""
     token_src: str
@@ -294,7 +460,8 @@ class EntradaGlosario:
     token_tgt: Optional[str] = None
     status: TokenStatus = TokenStatus.PENDIENTE
     margen: int = 0
-    ocurrencias: List[int] = field(default_factory=list)
+    # Posiciones del token como enteros compactos (4 bytes c/u)
+    ocurrencias: 'array[int]' = field(default_factory=lambda: array('i'))
     
     # Para partículas: funciones por posición
     func_roles: Dict[int, FuncRole] = field(default_factory=dict)
@@ -305,6 +472,23 @@ class EntradaGlosario:
     # Para polisemia en partículas
     traducciones_por_funcion: Dict[FuncRole, str] = field(default_factory=dict)
     
+    # Línea de listado ya formateada, con los valores de los que se obtuvo
+    _linea_cache: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    
+    def linea_listado(self) -> str:
+        """Línea 'tgt (src) [CATEGORIA] [etiqueta]' (se reutiliza si no cambió)"""
+        tgt, categoria, etiqueta = self.token_tgt, self.categoria, self.etiqueta
+        cache = self._linea_cache
+        if (cache is not None and cache[0] is tgt
+                and cache[1] is categoria and cache[2] is etiqueta):
+            return cache[3]
+        
+        linea = f"{tgt or '[PENDIENTE]'} ({self.token_src}) [{categoria.name}]"
+        if etiqueta:
+            linea += f" [{etiqueta}]"
+        self._linea_cache = (tgt, categoria, etiqueta, linea)
+        return linea
+    
     def es_nucleo(self) -> bool:
         return self.categoria == TokenCategoria.NUCLEO
     
@@ -323,14 +507,14 @@ class EntradaGlosario:
     
     def calcular_margen(self, origen: str) -> int:
         """Calcular margen según origen"""
-        return MARGEN_VALORES.get(origen, 1)
+        return _margen_por_origen(origen, 1)
 
 
 # ══════════════════════════════════════════════════════════════
 # ESTRUCTURAS DE CONSULTA Y DECISIÓN (P0)
 # ══════════════════════════════════════════════════════════════
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Opcion:
     """Opción para consulta"""
     letra: str
@@ -338,7 +522,7 @@ class Opcion:
     justificacion: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Consulta:
     """Consulta al usuario (P0.6)"""
     numero: int
@@ -348,27 +532,38 @@ class Consulta:
     opciones: List[Opcion]
     recomendacion: str  # Letra de opción recomendada
     
+    # Texto ya formateado; cualquier asignación de campo lo invalida
+    _fmt_cache: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __setattr__(self, nombre: str, valor: Any) -> None:
+        object.__setattr__(self, nombre, valor)
+        if nombre != "_fmt_cache":
+            object.__setattr__(self, "_fmt_cache", None)
+    
     def formatear(self) -> str:
         """Formatear consulta para presentación"""
+        if self._fmt_cache is not None:
+            return self._fmt_cache
+        
         lineas = [
-            "═" * 40,
+            _SEPARADOR,
             f"[CONSULTA {self.numero}: {self.codigo.name}]",
             "CONTEXTO:",
             f"  {self.contexto}",
             f"  Token/Frase: {self.token_o_frase}",
             "OPCIONES:"
         ]
-        for op in self.opciones:
-            linea = f"  {op.letra}) {op.texto}"
-            if op.justificacion:
-                linea += f" — {op.justificacion}"
-            lineas.append(linea)
-        lineas.append(f"RECOMENDACIÓN: {self.recomendacion}")
-        lineas.append("═" * 40)
-        return "\n".join(lineas)
+        lineas.extend(
+            f"  {op.letra}) {op.texto} — {op.justificacion}" if op.justificacion
+            else f"  {op.letra}) {op.texto}"
+            for op in self.opciones
+        )
+        lineas += (f"RECOMENDACIÓN: {self.recomendacion}", _SEPARADOR)
+        self._fmt_cache = "\n".join(lineas)
+        return self._fmt_cache
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Decision:
     """Registro de decisión tomada (P0.12)"""
     consulta_codigo: ConsultaCodigo
@@ -376,40 +571,61 @@ class Decision:
     opciones: List[str]
     decision: str
     origen: DecisionOrigen
-    timestamp: datetime = field(default_factory=datetime.now)
     regla_derivada: Optional[str] = None
+    
+    # Momento de creación en ns; el datetime se construye solo al leerlo
+    _creado_ns: int = field(default_factory=time.time_ns, init=False, repr=False)
+    
+    @property
+    def timestamp(self) -> datetime:
+        return _datetime_desde_ns(self._creado_ns)
 
 
-@dataclass
+@dataclass(slots=True)
 class ErrorCritico:
     """Error crítico que detiene el proceso"""
     tipo: FalloCritico
     mensaje: str
     contexto: Dict[str, Any]
-    timestamp: datetime = field(default_factory=datetime.now)
+    
+    # Momento de creación en ns; el datetime se construye solo al leerlo
+    _creado_ns: int = field(default_factory=time.time_ns, init=False, repr=False)
+    
+    # Texto ya formateado; cualquier asignación de campo lo invalida
+    _fmt_cache: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __setattr__(self, nombre: str, valor: Any) -> None:
+        object.__setattr__(self, nombre, valor)
+        if nombre != "_fmt_cache":
+            object.__setattr__(self, "_fmt_cache", None)
+    
+    @property
+    def timestamp(self) -> datetime:
+        return _datetime_desde_ns(self._creado_ns)
     
     def formatear(self) -> str:
+        if self._fmt_cache is not None:
+            return self._fmt_cache
+        
         lineas = [
-            "═" * 40,
+            _SEPARADOR,
             f"[FALLO CRÍTICO: {self.tipo.name}]",
             "",
             self.mensaje,
             "",
             "CONTEXTO:"
         ]
-        for k, v in self.contexto.items():
-            lineas.append(f"  {k}: {v}")
-        lineas.append(""),
-        lineas.append("ACCIÓN: DETENER. Requiere intervención del usuario.")
-        lineas.append("═" * 40)
-        return "\n".join(lineas)
+        lineas.extend(f"  {k}: {v}" for k, v in self.contexto.items())
+        lineas += ("", "ACCIÓN: DETENER. Requiere intervención del usuario.", _SEPARADOR)
+        self._fmt_cache = "\n".join(lineas)
+        return self._fmt_cache
 
 
 # ══════════════════════════════════════════════════════════════
 # ESTADO DEL PROCESO
 # ══════════════════════════════════════════════════════════════
 
-@dataclass
+@dataclass(slots=True)
 class EstadoProceso:
     """Estado actual del proceso de traducción"""
     fase_actual: str = "INICIO"
@@ -422,6 +638,11 @@ class EstadoProceso:
     glosario_pendientes: int = 0
     pausado: bool = False
     
+    def actualizar_progreso(self, hechas: int, total: int) -> None:
+        """Publicar el avance de P3-P7 (los llamadores lo agrupan por lotes)"""
+        self.oraciones_traducidas = hechas
+        self.total_oraciones = total
+    
     def progreso_porcentaje(self) -> float:
         if self.total_oraciones == 0:
             return 0.0
@@ -17,25 +17,103 @@ REGLA DE PREFERENCIA:
   Si etimología ≠ uso técnico pero metáfora viable → ETIMOLOGÍA.
 """
 
-from typing import Dict, List, Optional, Any, Tuple
+import sys
+import unicodedata
+
+from typing import Dict, List, Optional, Any, Tuple, Sequence
 from dataclasses import dataclass
+from functools import lru_cache
 from enum import Enum
 
 from constants import (
     TokenStatus, TokenCategoria, CategoriaGramatical,
-    Reason, JERARQUIA_ETIMOLOGICA, FalloCritico
+    Reason, JERARQUIA_ETIMOLOGICA, FalloCritico, MARGEN_VALORES
 )
 from models import (
-    SlotN, MorfologiaFuente, MorfologiaTarget, ErrorCritico
+    SlotN, MorfologiaFuente, MorfologiaTarget, ErrorCritico,
+    MORFOLOGIA_FUENTE_VACIA
 )
 from glossary import Glosario, SinonimiaError
 
 
+# Prioridad por origen: el primero de la jerarquía pesa más
+# (reversed para que, ante un origen repetido, gane su primera aparición;
+# claves internadas, igual que los orígenes de BaseEtimologica)
+_ORIGEN_PRIORIDAD: Dict[str, int] = {
+    sys.intern(origen): len(JERARQUIA_ETIMOLOGICA) - i
+    for i, origen in reversed(list(enumerate(JERARQUIA_ETIMOLOGICA)))
+}
+
+# Margen de decisión por razón de caso difícil (P4.F7), desde MARGEN_VALORES
+_MARGEN_POR_REASON: Dict[Reason, int] = {
+    reason: MARGEN_VALORES.get(reason.name, 1) for reason in Reason
+}
+
+# Miembros de estado en caché: los miembros Enum son únicos, se comparan
+# con `is` y se evita el acceso al atributo de clase en cada núcleo
+_BLOQUEADO = TokenStatus.BLOQUEADO
+_ASIGNADO = TokenStatus.ASIGNADO
+
+# Mensaje del resultado de P4.F1 (token bloqueado)
+_MENSAJE_BLOQUEADO = "Token bloqueado - parte de locución"
+
+
+@lru_cache(maxsize=4096)
+def _clave_normalizada(token: str) -> str:
+    """
+    Clave de segundo nivel para la base etimológica: forma NFC en minúsculas
+    
+    Solo unifica codificaciones del mismo texto (p. ej. ū precompuesta o
+    u + macron combinante); no quita diacríticos ni afijos, que distinguen
+    tokens distintos y romperían la paridad 1:1.
+    """
+    return unicodedata.normalize("NFC", token).lower()
+
+
+def _prioridad_origen(origen: str) -> int:
+    """Prioridad entera de un origen etimológico (0 si no está en la jerarquía)"""
+    return _ORIGEN_PRIORIDAD.get(origen, 0)
+
+
+def _ordenar_indices(prioridades: Sequence[int]) -> List[int]:
+    """Índices ordenados por prioridad descendente (estable ante empates)"""
+    return sorted(range(len(prioridades)), key=prioridades.__getitem__, reverse=True)
+
+# Terminaciones para la morfología de P4.F5 (pruebas por pertenencia)
+_VOCALES = frozenset("aeiou")
+_SIBILANTES_INVARIABLES = frozenset("sx")
+# Terminación de plural por letra final (el resto, incluida -z, toma -es)
+_SUFIJO_PLURAL: Dict[str, str] = {
+    **{v: "s" for v in _VOCALES},
+    **{c: "" for c in _SIBILANTES_INVARIABLES},  # -s, -x: plural invariable
+}
+_MASCULINOS_EN_A = frozenset({"ma", "ta"})
+_SUFIJOS_FEM_3 = frozenset({"dad", "tad", "tud"})
+_SUFIJOS_FEM_4 = frozenset({"ción", "sión"})
+
+
+@lru_cache(maxsize=1024)
+def _genero_por_sufijo(cola: str, con_genero_src: bool) -> str:
+    """
+    Género español según las cuatro últimas letras del término (P4.F5)
+    
+    Con género fuente se adapta (-a → femenino); sin él se infiere.
+    Solo la cola decide, así que la caché se comparte entre términos.
+    """
+    if cola[-1:] == "a":
+        if con_genero_src:
+            return "femenino"
+        return "masculino" if cola[-2:] in _MASCULINOS_EN_A else "femenino"
+    if not con_genero_src and (cola[-3:] in _SUFIJOS_FEM_3 or cola in _SUFIJOS_FEM_4):
+        return "femenino"
+    return "masculino"
+
+
 # ══════════════════════════════════════════════════════════════
 # ESTRUCTURAS DE DATOS
 # ══════════════════════════════════════════════════════════════
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CandidatoEtimologico:
     """Candidato encontrado en búsqueda etimológica"""
     termino: str
@@ -47,14 +125,10 @@ class CandidatoEtimologico:
     
     def calcular_prioridad(self) -> int:
         """Calcular prioridad según jerarquía etimológica"""
-        try:
-            self.prioridad = len(JERARQUIA_ETIMOLOGICA) - JERARQUIA_ETIMOLOGICA.index(self.origen)
-        except ValueError:
-            self.prioridad = 0
-        return self.prioridad
+        return _prioridad_origen(self.origen)
 
 
-@dataclass
+@dataclass(slots=True)
 class ResultadoNucleo:
     """Resultado del procesamiento de un núcleo"""
     exito: bool
@@ -64,17 +138,6 @@ class ResultadoNucleo:
     restart: bool = False
     reason: Optional[Reason] = None
     mensaje: str = ""
-    
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "exito": self.exito,
-            "token_tgt": self.token_tgt,
-            "morph_tgt": self.morph_tgt,
-            "bloqueado": self.bloqueado,
-            "restart": self.restart,
-            "reason": self.reason.name if self.reason else None,
-            "mensaje": self.mensaje
-        }
 
 
 # ══════════════════════════════════════════════════════════════
@@ -131,40 +194,84 @@ class BaseEtimologica:
             "ʿaql": ["ligadura", "sujeción"],  # "lo que ata/sujeta"
             "ʿayn": ["esencia", "fuente"],     # "ojo" como esencia
         }
-    
-    def buscar_raices(self, token_src: str) -> List[CandidatoEtimologico]:
-        """Buscar raíces etimológicas para un token"""
-        candidatos = []
         
-        datos = self._raices.get(token_src.lower(), [])
+        # Metáforas en minúsculas por clave normalizada (test O(1))
+        self._metaforas_lower: Dict[str, frozenset] = {
+            _clave_normalizada(token): frozenset(m.lower() for m in metaforas)
+            for token, metaforas in self._metaforas_viables.items()
+        }
         
-        for termino, origen, raiz, deriv_existe in datos:
-            cand = CandidatoEtimologico(
-                termino=termino,
-                origen=origen,
-                raiz=raiz,
-                derivacion_existe=deriv_existe,
-                es_metafora_viable=self._es_metafora_viable(token_src, termino)
-            )
-            cand.calcular_prioridad()
-            candidatos.append(cand)
+        # Candidatos ya construidos y ordenados, por clave normalizada
+        # (las tablas no cambian en ejecución)
+        self._raices_ordenadas: Dict[str, Tuple[CandidatoEtimologico, ...]] = {
+            _clave_normalizada(token): self._construir_candidatos(_clave_normalizada(token), datos)
+            for token, datos in self._raices.items()
+        }
         
-        # Ordenar por prioridad (mayor primero)
-        candidatos.sort(key=lambda c: c.prioridad, reverse=True)
+        # Columna de la raíz principal (primera registrada), sin candidatos
+        self._raiz_principal: Dict[str, str] = {
+            _clave_normalizada(token): sys.intern(datos[0][2])
+            for token, datos in self._raices.items() if datos
+        }
         
+        # Tokens con algún candidato de lectura metafórica (respuesta precalculada)
+        self._con_metafora: frozenset = frozenset(
+            clave for clave, candidatos in self._raices_ordenadas.items()
+            if any(c.es_metafora_viable for c in candidatos)
+        )
+    
+    def buscar_raices(self, token_src: str) -> Sequence[CandidatoEtimologico]:
+        """
+        Buscar raíces etimológicas para un token
+        
+        Devuelve una tupla compartida entre llamadas: no modificarla.
+        """
+        clave = token_src.lower()
+        candidatos = self._raices_ordenadas.get(clave)
+        if candidatos is None:
+            # Segundo nivel: misma palabra en otra forma Unicode
+            candidatos = self._raices_ordenadas.get(_clave_normalizada(clave), ())
         return candidatos
     
-    def _es_metafora_viable(self, token_src: str, termino: str) -> bool:
-        """Verificar si el término permite lectura metafórica"""
-        metaforas = self._metaforas_viables.get(token_src.lower(), [])
-        return termino.lower() in [m.lower() for m in metaforas]
+    def _construir_candidatos(self, token_lower: str,
+                              datos: List[Tuple[str, str, str, bool]]) -> Tuple[CandidatoEtimologico, ...]:
+        """Construir y ordenar los candidatos de un token (en __init__)"""
+        # Ranking sobre enteros: solo se comparan prioridades, no candidatos
+        # origen y raiz se repiten entre tokens, y termino acaba como clave
+        # del glosario (paridad 1:1): se internan para compartirlos
+        datos = [(sys.intern(termino), sys.intern(origen), sys.intern(raiz), deriv_existe)
+                 for termino, origen, raiz, deriv_existe in datos]
+        prioridades = [_prioridad_origen(origen) for _, origen, _, _ in datos]
+        return tuple(
+            CandidatoEtimologico(
+                termino=datos[i][0],
+                origen=datos[i][1],
+                raiz=datos[i][2],
+                derivacion_existe=datos[i][3],
+                es_metafora_viable=self._es_metafora_viable(token_lower, datos[i][0]),
+                prioridad=prioridades[i]
+            )
+            for i in _ordenar_indices(prioridades)
+        )
+    
+    def _es_metafora_viable(self, token_lower: str, termino: str) -> bool:
+        """Verificar si el término permite lectura metafórica (token ya en minúsculas)"""
+        metaforas = self._metaforas_lower.get(token_lower)
+        return metaforas is not None and termino.lower() in metaforas
+    
+    def tiene_metafora_viable(self, token_src: str) -> bool:
+        """¿Algún candidato del token permite lectura metafórica?"""
+        clave = token_src.lower()
+        con_metafora = self._con_metafora
+        return clave in con_metafora or _clave_normalizada(clave) in con_metafora
     
     def obtener_raiz(self, token_src: str) -> Optional[str]:
         """Obtener raíz principal de un token"""
-        datos = self._raices.get(token_src.lower(), [])
-        if datos:
-            return datos[0][2]  # Primera raíz
-        return None
+        clave = token_src.lower()
+        raiz = self._raiz_principal.get(clave)
+        if raiz is None:
+            raiz = self._raiz_principal.get(_clave_normalizada(clave))
+        return raiz
 
 
 # Instancia global
@@ -202,7 +309,18 @@ class ProcesadorNucleos:
         """Inyectar procesador de casos difíciles (P6)"""
         self._procesador_casos_dificiles = procesador
     
-    def procesar(self, slot_n: SlotN, glosario: Glosario) -> Dict[str, Any]:
+    def procesar_lote(self, slots: Sequence[SlotN], glosario: Glosario) -> List[ResultadoNucleo]:
+        """
+        Procesar los núcleos de una oración en una sola llamada
+        
+        Se recorren en orden: F7 de un slot alimenta el F2 (cache) de los
+        siguientes con el mismo token, así que no se paraleliza ni se toma
+        una instantánea del glosario.
+        """
+        procesar = self.procesar
+        return [procesar(slot_n, glosario) for slot_n in slots]
+    
+    def procesar(self, slot_n: SlotN, glosario: Glosario) -> ResultadoNucleo:
         """
         Procesar un núcleo léxico
         
@@ -211,21 +329,30 @@ class ProcesadorNucleos:
             glosario: Glosario del sistema
         
         Returns:
-            Diccionario con resultado del procesamiento
+            ResultadoNucleo del procesamiento
         """
+        # F1. Verificación de bloqueo (solo consultas, no lanza)
+        if slot_n.status is _BLOQUEADO:
+            bloqueado = True
+        else:
+            loc_id = glosario.fase_b_verificar_bloqueo(slot_n.token_src, slot_n.pos_index)
+            bloqueado = bool(loc_id)
+            if bloqueado:
+                slot_n.bloquear(loc_id)
+        if bloqueado:
+            return ResultadoNucleo(exito=True, bloqueado=True, mensaje=_MENSAJE_BLOQUEADO)
+        
         resultado = ResultadoNucleo(exito=False)
         
+        # F2. Cache check: token ya asignado en el glosario → usar esa traducción
+        entrada = glosario.obtener_entrada(slot_n.token_src)
+        if entrada and entrada.status is _ASIGNADO:
+            n_base = entrada.token_tgt
+        else:
+            n_base = None
+        
+        # F3–F7 sí pueden fallar (sinonimia, paridad): solo ellas van protegidas
         try:
-            # F1. Verificación de bloqueo
-            if self._f1_verificar_bloqueo(slot_n, glosario):
-                resultado.bloqueado = True
-                resultado.exito = True
-                resultado.mensaje = "Token bloqueado - parte de locución"
-                return resultado.to_dict()
-            
-            # F2. Cache check
-            n_base = self._f2_cache_check(slot_n, glosario)
-            
             if n_base is None:
                 # F3. Búsqueda de lexemas
                 candidatos = self._f3_busqueda_lexemas(slot_n)
@@ -249,7 +376,7 @@ class ProcesadorNucleos:
             # Asignar al slot
             slot_n.token_tgt = n_flexionado
             slot_n.morph_tgt = morph_tgt
-            slot_n.status = TokenStatus.ASIGNADO
+            slot_n.status = _ASIGNADO
             
             resultado.exito = True
             resultado.token_tgt = n_flexionado
@@ -263,51 +390,13 @@ class ProcesadorNucleos:
             resultado.exito = False
             resultado.mensaje = f"Error: {str(e)}"
         
-        return resultado.to_dict()
-    
-    # ══════════════════════════════════════════════════════════
-    # F1. VERIFICACIÓN DE BLOQUEO
-    # ══════════════════════════════════════════════════════════
-    
-    def _f1_verificar_bloqueo(self, slot_n: SlotN, glosario: Glosario) -> bool:
-        """
-        F1. Verificación de bloqueo (P4.F1)
-        
-        Si token está BLOQUEADO → parte de locución, no traducir individualmente
-        """
-        if slot_n.status == TokenStatus.BLOQUEADO:
-            return True
-        
-        # Verificar también en glosario
-        loc_id = glosario.fase_b_verificar_bloqueo(slot_n.token_src, slot_n.pos_index)
-        if loc_id:
-            slot_n.bloquear(loc_id)
-            return True
-        
-        return False
-    
-    # ══════════════════════════════════════════════════════════
-    # F2. CACHE CHECK
-    # ══════════════════════════════════════════════════════════
-    
-    def _f2_cache_check(self, slot_n: SlotN, glosario: Glosario) -> Optional[str]:
-        """
-        F2. Cache check (P4.F2)
-        
-        Si token ya está en glosario con traducción asignada → usar esa
-        """
-        entrada = glosario.obtener_entrada(slot_n.token_src)
-        
-        if entrada and entrada.status == TokenStatus.ASIGNADO:
-            return entrada.token_tgt
-        
-        return None
+        return resultado
     
     # ══════════════════════════════════════════════════════════
     # F3. BÚSQUEDA DE LEXEMAS
     # ══════════════════════════════════════════════════════════
     
-    def _f3_busqueda_lexemas(self, slot_n: SlotN) -> List[CandidatoEtimologico]:
+    def _f3_busqueda_lexemas(self, slot_n: SlotN) -> Sequence[CandidatoEtimologico]:
         """
         F3. Búsqueda de lexemas (P4.F3)
         
@@ -322,7 +411,7 @@ class ProcesadorNucleos:
     # F4. SELECCIÓN
     # ══════════════════════════════════════════════════════════
     
-    def _f4_seleccion(self, slot_n: SlotN, candidatos: List[CandidatoEtimologico],
+    def _f4_seleccion(self, slot_n: SlotN, candidatos: Sequence[CandidatoEtimologico],
                       glosario: Glosario) -> Tuple[str, Optional[Reason]]:
         """
         F4. Selección (P4.F4)
@@ -361,7 +450,7 @@ class ProcesadorNucleos:
     
     def _manejar_caso_dificil(self, slot_n: SlotN, reason: Reason,
                               glosario: Glosario,
-                              candidatos: List[CandidatoEtimologico] = None) -> Tuple[str, Reason]:
+                              candidatos: Sequence[CandidatoEtimologico] = None) -> Tuple[str, Reason]:
         """Delegar a P6 para casos difíciles"""
         if self._procesador_casos_dificiles:
             resultado = self._procesador_casos_dificiles.procesar(
@@ -399,6 +488,12 @@ class ProcesadorNucleos:
         Ignorar: caso gramatical
         Género: heredar del español o adaptar
         """
+        # Caso más común: singular sin más rasgos → solo se infiere el género
+        if (morph_src.numero == "singular" and morph_src.genero is None
+                and morph_src.persona is None and morph_src.tiempo is None
+                and morph_src.voz is None):
+            return n_base, MorfologiaTarget(genero=_genero_por_sufijo(n_base[-4:], False))
+        
         morph_tgt = MorfologiaTarget()
         n_flexionado = n_base
         
@@ -414,10 +509,7 @@ class ProcesadorNucleos:
             n_flexionado = self._pluralizar(n_base)
         
         # GÉNERO
-        if morph_src.genero:
-            morph_tgt.genero = self._adaptar_genero(n_base, morph_src.genero)
-        else:
-            morph_tgt.genero = self._inferir_genero(n_base)
+        morph_tgt.genero = _genero_por_sufijo(n_base[-4:], bool(morph_src.genero))
         
         # PERSONA (verbos)
         if morph_src.persona:
@@ -437,29 +529,16 @@ class ProcesadorNucleos:
     
     def _pluralizar(self, termino: str) -> str:
         """Pluralizar un término en español"""
-        if termino.endswith(("a", "e", "i", "o", "u")):
-            return termino + "s"
-        elif termino.endswith(("s", "x", "z")):
-            return termino + "es" if termino.endswith("z") else termino
-        else:
-            return termino + "es"
+        return termino + _SUFIJO_PLURAL.get(termino[-1:], "es")
     
     def _adaptar_genero(self, termino: str, genero_src: str) -> str:
         """Adaptar género según el español"""
         # Simplificado - en producción se usaría diccionario
-        if termino.endswith("a"):
-            return "femenino"
-        elif termino.endswith("o"):
-            return "masculino"
-        return "masculino"  # Default
+        return _genero_por_sufijo(termino[-4:], True)
     
     def _inferir_genero(self, termino: str) -> str:
         """Inferir género del término en español"""
-        if termino.endswith("a") and not termino.endswith(("ma", "ta")):
-            return "femenino"
-        elif termino.endswith(("ción", "sión", "dad", "tad", "tud")):
-            return "femenino"
-        return "masculino"
+        return _genero_por_sufijo(termino[-4:], False)
     
     def _conjugar_persona(self, termino: str, persona: int) -> str:
         """Conjugar verbo según persona (simplificado)"""
@@ -512,13 +591,7 @@ class ProcesadorNucleos:
     
     def _calcular_margen(self, reason: Reason) -> int:
         """Calcular margen de decisión según razón"""
-        margenes = {
-            Reason.IDIOM: 6,
-            Reason.COLLISION: 5,
-            Reason.NO_ROOT: 4,
-            Reason.GAP_DERIVATION: 4,
-        }
-        return margenes.get(reason, 1)
+        return _MARGEN_POR_REASON.get(reason, 1)
 
 
 # ══════════════════════════════════════════════════════════════
@@ -526,12 +599,12 @@ class ProcesadorNucleos:
 # ══════════════════════════════════════════════════════════════
 
 def crear_slot_n(token_src: str, cat_src: CategoriaGramatical,
-                 pos_index: int, morph: MorfologiaFuente = None) -> SlotN:
+                 pos_index: int, morph: MorfologiaFuente = MORFOLOGIA_FUENTE_VACIA) -> SlotN:
     """Crear un SlotN con valores por defecto"""
     return SlotN(
         token_src=token_src,
         cat_src=cat_src,
-        morph_src=morph or MorfologiaFuente(),
+        morph_src=morph or MORFOLOGIA_FUENTE_VACIA,
         pos_index=pos_index,
         status=TokenStatus.PENDIENTE
     )
@@ -544,7 +617,4 @@ def es_metafora_viable(token_src: str, contexto: str = None) -> bool:
     Implementación de la regla:
     Si etimología ≠ uso técnico pero metáfora viable → ETIMOLOGÍA
     """
-    base = obtener_base_etimologica()
-    candidatos = base.buscar_raices(token_src)
-    
-    return any(c.es_metafora_viable for c in candidatos)
+    return obtener_base_etimologica().tiene_metafora_viable(token_src)
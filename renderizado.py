@@ -18,7 +18,7 @@ from typing import List, Optional, Dict, Any, Tuple
 from dataclasses import dataclass
 from enum import Enum, auto
 
-from constants import ModoTransliteracion, ModoSalida
+from constants import ModoTransliteracion, ModoSalida, CeldaTipo
 from models import MatrizTarget, CeldaMatriz
 from config import obtener_config
 
@@ -316,13 +316,13 @@ class PostProcesador:
                 if celda.es_nulo():
                     self._operadores_aplicados["nulo"] += 1
                     resultado.append(f"{{{token}}}")
-                elif celda.tipo == "locucion":
+                elif celda.tipo is CeldaTipo.LOCUCION:
                     self._operadores_aplicados["locucion"] += 1
                     resultado.append(token)  # Ya viene con guiones
-                elif celda.tipo == "cita":
+                elif celda.tipo is CeldaTipo.CITA:
                     self._operadores_aplicados["cita"] += 1
                     resultado.append(f"«{token}»")
-                elif celda.tipo == "titulo":
+                elif celda.tipo is CeldaTipo.TITULO:
                     self._operadores_aplicados["titulo"] += 1
                     resultado.append(f"**{token}**")
                 else:
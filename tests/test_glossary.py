@@ -0,0 +1,210 @@
+"""
+Pruebas del glosario (P8)
+"""
+
+import pytest
+
+from config import obtener_config
+from constants import TokenCategoria, TokenStatus
+from glossary import Glosario
+
+
+@pytest.fixture
+def predefinidas():
+    """Fijar locuciones predefinidas en la configuración global y restaurarlas"""
+    config = obtener_config()
+    anteriores = config.locuciones_predefinidas
+    
+    def fijar(locuciones):
+        config.locuciones_predefinidas = list(locuciones)
+    
+    yield fijar
+    config.locuciones_predefinidas = anteriores
+
+
+# ══════════════════════════════════════════════════════════════
+# A1. DETECCIÓN DE LOCUCIONES
+# ══════════════════════════════════════════════════════════════
+
+def test_a1_detecta_locuciones_anidadas_y_solapadas(predefinidas):
+    predefinidas(["bi-smi-llah", "min ajl", "ajl", "smi"])
+    texto = "bi-smi-llah el ʿaql min ajl kitāb."
+    
+    locuciones = Glosario()._a1_detectar_locuciones(texto)
+    
+    # Cada predefinida presente se detecta, aunque esté dentro de otra
+    assert [l.src for l in locuciones] == ["bi-smi-llah", "min ajl", "ajl", "smi"]
+
+
+def test_a1_omite_predefinidas_ausentes(predefinidas):
+    predefinidas(["min ajl", "fi sabil"])
+    
+    locuciones = Glosario()._a1_detectar_locuciones("ʿaql min ajl nafs")
+    
+    assert [l.src for l in locuciones] == ["min ajl"]
+
+
+def test_a1_posiciones_desde_la_primera_aparicion(predefinidas):
+    predefinidas(["min ajl", "ajl"])
+    texto = "ajl wa min ajl"
+    
+    locuciones = Glosario()._a1_detectar_locuciones(texto)
+    
+    # Cada locución arranca en su propia primera aparición, no en la de otra
+    posiciones = {l.src: list(l.posiciones) for l in locuciones}
+    assert posiciones == {"min ajl": [7, 8], "ajl": [0]}
+
+
+# ══════════════════════════════════════════════════════════════
+# ALTERNATIVAS (ALTO MARGEN)
+# ══════════════════════════════════════════════════════════════
+
+def test_alternativas_en_orden_del_glosario():
+    glosario = Glosario()
+    for token in ("fi", "min", "ʿan"):
+        glosario.agregar_entrada(token, TokenCategoria.PARTICULA)
+    
+    # Los márgenes cambian en otro orden que el de alta en el glosario
+    glosario.fase_b_asignar("ʿan", "sobre", margen=3)
+    glosario.fase_b_asignar("fi", "en", margen=4)
+    glosario.fase_b_asignar("min", "de", margen=3)
+    # Bajar y volver a subir no mueve la entrada al final
+    glosario.fase_b_asignar("fi", "en", margen=1)
+    glosario.fase_b_asignar("fi", "en", margen=3)
+    
+    assert [e.token_src for e in glosario.obtener_alternativas()] == ["fi", "min", "ʿan"]
+
+
+def test_alternativas_excluye_margen_bajo():
+    glosario = Glosario()
+    for token in ("fi", "min"):
+        glosario.agregar_entrada(token, TokenCategoria.PARTICULA)
+    glosario.fase_b_asignar("fi", "en", margen=3)
+    glosario.fase_b_asignar("min", "de", margen=2)
+    glosario.fase_b_asignar("fi", "en", margen=1)
+    
+    assert glosario.obtener_alternativas() == []
+
+
+# ══════════════════════════════════════════════════════════════
+# HISTORIAL (ANILLO ACOTADO)
+# ══════════════════════════════════════════════════════════════
+
+@pytest.fixture
+def historial_max():
+    """Fijar el tamaño del historial en la configuración global y restaurarlo"""
+    config = obtener_config()
+    anterior = config.historial_max
+    
+    def fijar(n):
+        config.historial_max = n
+    
+    yield fijar
+    config.historial_max = anterior
+
+
+def _tokens_historial(glosario):
+    return [h["datos"]["token"] for h in glosario.iterar_historial()]
+
+
+def test_historial_sin_llenar_en_orden(historial_max):
+    historial_max(5)
+    glosario = Glosario()
+    for token in ("a", "b", "c"):
+        glosario.agregar_entrada(token, TokenCategoria.NUCLEO)
+    
+    assert _tokens_historial(glosario) == ["a", "b", "c"]
+    assert [h["accion"] for h in glosario.obtener_historial()] == ["ENTRADA_AGREGADA_USUARIO"] * 3
+
+
+def test_historial_conserva_los_mas_recientes_al_dar_la_vuelta(historial_max):
+    historial_max(3)
+    glosario = Glosario()
+    for token in ("a", "b", "c", "d", "e", "f", "g"):
+        glosario.agregar_entrada(token, TokenCategoria.NUCLEO)
+    
+    # Del más antiguo al más reciente, tras más de una vuelta completa
+    assert _tokens_historial(glosario) == ["e", "f", "g"]
+    assert glosario.obtener_historial() == list(glosario.iterar_historial())
+    marcas = [h["timestamp"] for h in glosario.iterar_historial()]
+    assert marcas == sorted(marcas)
+
+
+def test_historial_reset_vacia_el_anillo(historial_max):
+    historial_max(2)
+    glosario = Glosario()
+    for token in ("a", "b", "c"):
+        glosario.agregar_entrada(token, TokenCategoria.NUCLEO)
+    
+    glosario.reset()
+    assert glosario.obtener_historial() == []
+    
+    glosario.agregar_entrada("d", TokenCategoria.NUCLEO)
+    assert _tokens_historial(glosario) == ["d"]
+
+
+# ══════════════════════════════════════════════════════════════
+# CONTADORES DE ESTADO
+# ══════════════════════════════════════════════════════════════
+
+def _conteo(glosario):
+    estadisticas = glosario.obtener_estadisticas()
+    return (estadisticas["total"], estadisticas["asignadas"],
+            estadisticas["pendientes"], estadisticas["bloqueadas"])
+
+
+def _recuento(glosario):
+    """Contar los estados recorriendo las entradas, sin los contadores"""
+    status = [e.status for e in glosario._entradas.values()]
+    return (len(status), status.count(TokenStatus.ASIGNADO),
+            status.count(TokenStatus.PENDIENTE), status.count(TokenStatus.BLOQUEADO))
+
+
+def test_contadores_siguen_las_transiciones():
+    glosario = Glosario()
+    glosario.agregar_entrada("nafs", TokenCategoria.NUCLEO)
+    glosario.agregar_entrada("ʿaql", TokenCategoria.NUCLEO)
+    glosario.agregar_entrada("wujūd", TokenCategoria.NUCLEO, tgt="existencia")
+    assert _conteo(glosario) == _recuento(glosario) == (3, 1, 2, 0)
+    
+    # PENDIENTE → ASIGNADO
+    glosario.fase_b_asignar("nafs", "alma")
+    assert _conteo(glosario) == _recuento(glosario) == (3, 2, 1, 0)
+    
+    # Reasignar un núcleo ya asignado no cambia los contadores
+    glosario.fase_b_asignar("nafs", "alma")
+    assert _conteo(glosario) == (3, 2, 1, 0)
+    
+    # ASIGNADO / PENDIENTE → BLOQUEADO por locución
+    glosario.agregar_locucion("nafs ʿaql", ["nafs", "ʿaql"], [0, 1], "alma-intelecto")
+    assert _conteo(glosario) == _recuento(glosario) == (3, 1, 0, 2)
+    
+    # Eliminar descuenta el estado de la entrada eliminada
+    glosario.eliminar_entrada("nafs")
+    assert _conteo(glosario) == _recuento(glosario) == (2, 1, 0, 1)
+    glosario.eliminar_entrada("wujūd")
+    assert _conteo(glosario) == _recuento(glosario) == (1, 0, 0, 1)
+
+
+def test_contadores_tras_reset():
+    glosario = Glosario()
+    glosario.agregar_entrada("nafs", TokenCategoria.NUCLEO, tgt="alma")
+    glosario.agregar_entrada("ʿaql", TokenCategoria.NUCLEO)
+    glosario.agregar_locucion("nafs ʿaql", ["nafs", "ʿaql"], [0, 1], "alma-intelecto")
+    
+    glosario.reset()
+    assert _conteo(glosario) == (0, 0, 0, 0)
+    
+    glosario.agregar_entrada("wujūd", TokenCategoria.NUCLEO)
+    assert _conteo(glosario) == _recuento(glosario) == (1, 0, 1, 0)
+
+
+def test_contadores_tras_importar_json():
+    glosario = Glosario()
+    glosario.agregar_entrada("nafs", TokenCategoria.NUCLEO, tgt="alma")
+    glosario.agregar_entrada("ʿaql", TokenCategoria.NUCLEO)
+    glosario.agregar_entrada("wujūd", TokenCategoria.NUCLEO)
+    glosario.agregar_locucion("ʿaql wujūd", ["ʿaql", "wujūd"], [0, 1], "intelecto-existencia")
+    
+    importado = Glosario.importar_json(glosario.exportar_json())
+    assert _conteo(importado) == _recuento(importado) == _conteo(glosario) == (3, 1, 0, 2)
@@ -0,0 +1,107 @@
+"""
+Pruebas de la interfaz de línea de comandos
+"""
+
+import sys
+
+import pytest
+
+from main import CLI, SistemaTraduccion, main
+
+
+@pytest.fixture
+def cli():
+    return CLI()
+
+
+@pytest.mark.parametrize("texto", [
+    "glosario",
+    "  Estado",
+    "AYUDA protocolos",
+    "exportar\tcsv",
+])
+def test_es_comando_primera_palabra(cli, texto):
+    assert cli._es_comando(texto)
+
+
+@pytest.mark.parametrize("texto", [
+    "",
+    "   ",
+    "Estado, nación y pueblo",
+    "glosario:",
+    "Ayuda.",
+    "Modo-x",
+    "ʿaql wa nafs",
+])
+def test_texto_con_puntuacion_no_es_comando(cli, texto):
+    # La primera palabra va hasta el primer espacio: la puntuación cuenta
+    assert not cli._es_comando(texto)
+
+
+# ══════════════════════════════════════════════════════════════
+# MODO ARCHIVO Y TRADUCCIÓN POR FRAGMENTOS
+# ══════════════════════════════════════════════════════════════
+
+def test_stream_cuenta_posiciones_por_fragmento():
+    sistema = SistemaTraduccion()
+    list(sistema.traducir_stream(["ʿaql wa nafs.", "wujūd wa nafs."]))
+    
+    glosario = sistema.glosario
+    # Cada fragmento numera sus tokens desde 0 (no desde el texto completo)
+    assert list(glosario.obtener_entrada("nafs").ocurrencias) == [2, 2]
+    assert list(glosario.obtener_entrada("wujūd").ocurrencias) == [0]
+
+
+def test_main_archivo_ilegible_no_crea_salida(tmp_path, monkeypatch, capsys):
+    entrada = tmp_path / "texto.txt"
+    entrada.write_bytes(b"\xff\xfe no es utf-8")
+    monkeypatch.setattr(sys, "argv", ["main.py", str(entrada)])
+    
+    main()
+    
+    salida = capsys.readouterr().out
+    assert not (tmp_path / "texto_traducido.txt").exists()
+    assert "Error al cargar texto" in salida
+    assert "Traducción guardada" not in salida
+
+
+def test_main_archivo_vacio_no_crea_salida(tmp_path, monkeypatch, capsys):
+    entrada = tmp_path / "texto.txt"
+    entrada.write_text("  \n\n", encoding="utf-8")
+    monkeypatch.setattr(sys, "argv", ["main.py", str(entrada)])
+    
+    main()
+    
+    assert not (tmp_path / "texto_traducido.txt").exists()
+    assert "Traducción guardada" not in capsys.readouterr().out
+
+
+def test_main_archivo_traduce_y_guarda(tmp_path, monkeypatch, capsys):
+    entrada = tmp_path / "texto.txt"
+    entrada.write_text("ʿaql wa nafs.\n", encoding="utf-8")
+    monkeypatch.setattr(sys, "argv", ["main.py", str(entrada)])
+    
+    main()
+    
+    guardada = (tmp_path / "texto_traducido.txt").read_text(encoding="utf-8")
+    assert guardada == SistemaTraduccion().traducir("ʿaql wa nafs.")
+    assert "Traducción guardada" in capsys.readouterr().out
+
+
+# ══════════════════════════════════════════════════════════════
+# LOCUCIONES EN LA MATRIZ FUENTE
+# ══════════════════════════════════════════════════════════════
+
+def test_locuciones_solapadas_gana_la_primera_del_glosario():
+    sistema = SistemaTraduccion()
+    glosario = sistema.glosario
+    # La primera dada de alta empieza después de la segunda
+    primera = glosario.agregar_locucion("wa nafs", ["wa", "nafs"], [1, 2], "y-alma")
+    segunda = glosario.agregar_locucion("ʿaql wa", ["ʿaql", "wa"], [0, 1], "razón-y")
+    
+    sistema._indexar_locuciones()
+    mtx = sistema._crear_matriz_fuente("ʿaql wa nafs")
+    
+    assert mtx.obtener_locucion_en_pos(0) is segunda
+    assert mtx.obtener_locucion_en_pos(1) is primera
+    assert mtx.obtener_locucion_en_pos(2) is primera
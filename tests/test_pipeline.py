@@ -0,0 +1,94 @@
+"""
+Pruebas del productor de Mtx_S (P3-P7 con textos largos)
+"""
+
+import threading
+
+import pytest
+
+from main import SistemaTraduccion
+
+
+def _texto(n_oraciones: int) -> str:
+    oraciones = ["Nafs wa ʿaql.", "Huwa ḥaqq wa wujūd.", "Kalima wa ʿayn."]
+    return " ".join(oraciones[i % len(oraciones)] for i in range(n_oraciones))
+
+
+def _hilos_productores():
+    return [h for h in threading.enumerate() if h.name == "P8-MtxS"]
+
+
+def _secuencial(sistema: SistemaTraduccion) -> SistemaTraduccion:
+    """Forzar el camino sin hilo productor en esta instancia"""
+    sistema._UMBRAL_PIPELINE = 10 ** 9
+    return sistema
+
+
+@pytest.mark.parametrize("n_oraciones", [5, 31, 32, 40])
+def test_misma_salida_que_la_traduccion_secuencial(n_oraciones):
+    texto = _texto(n_oraciones)
+    
+    con_productor = SistemaTraduccion()
+    secuencial = _secuencial(SistemaTraduccion())
+    
+    assert con_productor.traducir(texto) == secuencial.traducir(texto)
+    assert con_productor.estado.total_oraciones == n_oraciones
+    assert con_productor._oraciones_traducidas == secuencial._oraciones_traducidas
+    assert not _hilos_productores()
+
+
+def test_error_del_productor_se_propaga_sin_dejar_hilo(monkeypatch):
+    sistema = SistemaTraduccion()
+    crear = sistema._crear_matriz_fuente
+    llamadas = []
+    
+    def crear_con_fallo(oracion, tokens=None):
+        llamadas.append(oracion)
+        if len(llamadas) == 20:
+            raise RuntimeError("fallo en Mtx_S")
+        return crear(oracion, tokens)
+    
+    monkeypatch.setattr(sistema, "_crear_matriz_fuente", crear_con_fallo)
+    
+    with pytest.raises(RuntimeError, match="fallo en Mtx_S"):
+        sistema.traducir(_texto(40))
+    assert not _hilos_productores()
+
+
+def test_error_del_consumidor_no_deja_hilo(monkeypatch):
+    sistema = SistemaTraduccion()
+    traducir_oracion = sistema._traducir_oracion
+    traducidas = []
+    
+    def traducir_con_fallo(oracion, mtx_s=None):
+        if len(traducidas) == 5:
+            raise RuntimeError("fallo en Core")
+        traducidas.append(oracion)
+        return traducir_oracion(oracion, mtx_s)
+    
+    monkeypatch.setattr(sistema, "_traducir_oracion", traducir_con_fallo)
+    
+    with pytest.raises(RuntimeError, match="fallo en Core"):
+        sistema.traducir(_texto(40))
+    # Sin esperar al GC: la excepción conserva el marco de traducir
+    assert not _hilos_productores()
+
+
+def test_pausa_detiene_el_productor_y_conserva_el_orden(monkeypatch):
+    sistema = SistemaTraduccion()
+    referencia = _secuencial(SistemaTraduccion())
+    referencia.traducir(_texto(40))
+    traducir_oracion = sistema._traducir_oracion
+    
+    def traducir_y_pausar(oracion, mtx_s=None):
+        resultado = traducir_oracion(oracion, mtx_s)
+        if len(sistema._oraciones_traducidas) == 9:
+            sistema.estado.pausado = True
+        return resultado
+    
+    monkeypatch.setattr(sistema, "_traducir_oracion", traducir_y_pausar)
+    
+    sistema.traducir(_texto(40))
+    
+    assert sistema._oraciones_traducidas == referencia._oraciones_traducidas[:10]
+    assert not _hilos_productores()
@@ -3,6 +3,7 @@
 # ══════════════════════════════════════════════════════════════
 
 import re
+import sys
 import json
 import os
 from typing import List, Dict, Optional, Any, Tuple, Generator
@@ -23,6 +24,11 @@ class Tokenizador:
     # Patrones de separación
     _PATRON_PALABRAS = re.compile(r'[\w\u0600-\u06FF\u0750-\u077F]+', re.UNICODE)
     _PATRON_PUNTUACION = re.compile(r'[.,;:!?¿¡«»"\'()\[\]{}–—]')
+    # Corte de oración o palabra, para tokenizar y dividir en una pasada
+    _PATRON_CORTE_O_PALABRA = re.compile(
+        r'(?P<corte>(?<=[.!?])\s+(?=[A-ZÁÉÍÓÚأإآ]))|[\w\u0600-\u06FF\u0750-\u077F]+',
+        re.UNICODE
+    )
     
     @classmethod
     def tokenizar(cls, texto: str) -> List[str]:
@@ -44,6 +50,39 @@ class Tokenizador:
         oraciones = re.split(r'(?<=[.!?])\s+(?=[A-ZÁÉÍÓÚأإآ])', texto)
         return [o.strip() for o in oraciones if o.strip()]
     
+    @classmethod
+    def tokenizar_con_oraciones(cls, texto: str) -> Tuple[List[List[str]], List[str]]:
+        """
+        Dividir en oraciones y tokenizar en una sola pasada
+        
+        Returns:
+            Tupla (tokens por oración, oraciones); equivale a aplicar
+            `tokenizar` a cada resultado de `dividir_oraciones`
+        """
+        tokens_por_oracion: List[List[str]] = []
+        oraciones: List[str] = []
+        actuales: List[str] = []
+        inicio = 0
+        
+        for match in cls._PATRON_CORTE_O_PALABRA.finditer(texto):
+            if match.lastgroup != "corte":
+                # Internar: cada aparición comparte objeto con la clave del glosario
+                actuales.append(sys.intern(match.group()))
+                continue
+            oracion = texto[inicio:match.start()].strip()
+            if oracion:
+                oraciones.append(oracion)
+                tokens_por_oracion.append(actuales)
+            actuales = []
+            inicio = match.end()
+        
+        oracion = texto[inicio:].strip()
+        if oracion:
+            oraciones.append(oracion)
+            tokens_por_oracion.append(actuales)
+        
+        return tokens_por_oracion, oraciones
+    
     @classmethod
     def es_arabe(cls, texto: str) -> bool:
         """Verificar si el texto contiene caracteres árabes"""
@@ -186,6 +225,32 @@ class GestorArchivos:
             print(f"Error al cargar texto: {e}")
             return None
     
+    @staticmethod
+    def cargar_texto_stream(ruta: str, tamano_fragmento: int = 1 << 16) -> Generator[str, None, None]:
+        """
+        Cargar texto plano por fragmentos
+        
+        Corta solo en líneas en blanco (fin de párrafo) para no partir
+        oraciones; cada fragmento ronda `tamano_fragmento` caracteres.
+        Los errores de lectura se propagan: quien consume el flujo ya ha
+        podido escribir parte de la salida y debe enterarse.
+        """
+        with open(ruta, 'r', encoding='utf-8') as f:
+            partes: List[str] = []
+            acumulado = 0
+            for linea in f:
+                partes.append(linea)
+                acumulado += len(linea)
+                if acumulado >= tamano_fragmento and not linea.strip():
+                    fragmento = "".join(partes).strip()
+                    if fragmento:
+                        yield fragmento
+                    partes = []
+                    acumulado = 0
+            fragmento = "".join(partes).strip()
+            if fragmento:
+                yield fragmento
+    
     @staticmethod
     def existe(ruta: str) -> bool:
         """Verificar si archivo existe"""
@@ -223,9 +288,15 @@ class Logger:
         self.nivel = self._NIVELES.get(nivel.upper(), 1)
         self._mensajes: List[Dict[str, Any]] = []
     
-    def _log(self, nivel: str, mensaje: str) -> None:
-        """Registrar mensaje"""
+    def habilitado(self, nivel: str) -> bool:
+        """Verificar si un nivel supera el umbral actual"""
+        return self._NIVELES.get(nivel, 0) >= self.nivel
+    
+    def _log(self, nivel: str, mensaje: str, args: tuple = ()) -> None:
+        """Registrar mensaje (los args %-style se formatean solo si se emite)"""
         if self._NIVELES.get(nivel, 0) >= self.nivel:
+            if args:
+                mensaje = mensaje % args
             entrada = {
                 "timestamp": datetime.now().isoformat(),
                 "nivel": nivel,
@@ -234,20 +305,20 @@ class Logger:
             self._mensajes.append(entrada)
             print(f"[{nivel}] {self.nombre}: {mensaje}")
     
-    def debug(self, mensaje: str) -> None:
-        self._log("DEBUG", mensaje)
+    def debug(self, mensaje: str, *args: Any) -> None:
+        self._log("DEBUG", mensaje, args)
     
-    def info(self, mensaje: str) -> None:
-        self._log("INFO", mensaje)
+    def info(self, mensaje: str, *args: Any) -> None:
+        self._log("INFO", mensaje, args)
     
-    def warning(self, mensaje: str) -> None:
-        self._log("WARNING", mensaje)
+    def warning(self, mensaje: str, *args: Any) -> None:
+        self._log("WARNING", mensaje, args)
     
-    def error(self, mensaje: str) -> None:
-        self._log("ERROR", mensaje)
+    def error(self, mensaje: str, *args: Any) -> None:
+        self._log("ERROR", mensaje, args)
     
-    def critical(self, mensaje: str) -> None:
-        self._log("CRITICAL", mensaje)
+    def critical(self, mensaje: str, *args: Any) -> None:
+        self._log("CRITICAL", mensaje, args)
     
     def obtener_historial(self) -> List[Dict[str, Any]]:
         return self._mensajes.copy()